@@ -0,0 +1,177 @@
+import asyncio
+import ollama
+from core.context_window import estimate_tokens
+from core.dispatcher import STAT_KEYS
+from core.llm_handler import EntryInterrupted, INTERRUPTED_NOTE, LLMHandler, MAP_REDUCE_THRESHOLD, STYLE_WAIT
+
+# Key-moment requests in flight at once (more just queue up on a CPU-only Ollama)
+MAP_WORKERS = 2
+
+
+class AsyncLLMHandler(LLMHandler):
+    """LLMHandler whose chat and journal calls are coroutines
+
+    Requests go over a single ollama.AsyncClient, so its HTTP connections
+    are reused for the whole session. Cancelling the task (or closing a
+    stream early) closes the request. Summaries and speculative drafts
+    still run on the background dispatcher, which is held off while a
+    request here is in flight.
+    """
+
+    def __init__(self, *args, client=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Created on first use, so it binds to the loop that runs it
+        self.client = client
+
+    def _client(self):
+        if self.client is None:
+            self.client = ollama.AsyncClient()
+        return self.client
+
+    def _options(self, task, model, messages):
+        kwargs = {}
+        if self.keep_alive is not None:
+            kwargs['keep_alive'] = self.keep_alive
+        if self.profiles is not None:
+            kwargs['options'] = self.profiles.options(task, model, messages)
+        return kwargs
+
+    def _record(self, task, model, messages, part):
+        if self.profiles is not None:
+            self.profiles.record(task, model, messages, {key: part.get(key) for key in STAT_KEYS})
+
+    async def _complete(self, messages, model=None, task='chat'):
+        """Send a chat request and return the reply text"""
+        model = model or self.model
+        with self.dispatcher.hold():
+            response = await self._client().chat(model=model, messages=messages,
+                                                 **self._options(task, model, messages))
+        self._record(task, model, messages, response)
+        return response['message']['content']
+
+    async def _stream(self, messages, model=None, task='chat'):
+        """Send a chat request and yield the reply as it is generated"""
+        model = model or self.model
+        with self.dispatcher.hold():
+            stream = await self._client().chat(model=model, messages=messages, stream=True,
+                                               **self._options(task, model, messages))
+            async for part in stream:
+                chunk = part['message']['content']
+                if chunk:
+                    yield chunk
+                if part.get('done'):
+                    self._record(task, model, messages, part)
+
+    async def chat(self, user_message):
+        """Continue the conversation"""
+        if self._add_user_message(user_message):
+            self._add_assistant_message(self.END_RESPONSE)
+            return self.END_RESPONSE, True
+
+        try:
+            assistant_message = await self._complete(self._chat_messages())
+            self._add_assistant_message(assistant_message)
+            return assistant_message, False
+
+        except Exception as e:
+            return f"Sorry, I'm having trouble connecting. Make sure Ollama is running. Error: {str(e)}", False
+
+    async def chat_stream(self, user_message):
+        """Continue the conversation, yielding (chunk, is_done) tuples"""
+        if self._add_user_message(user_message):
+            self._add_assistant_message(self.END_RESPONSE)
+            yield self.END_RESPONSE, True
+            return
+
+        parts = []
+        budget = self._reply_budget()
+        stream = self._stream(self._chat_messages())
+        try:
+            async for chunk in stream:
+                parts.append(chunk)
+                yield chunk, False
+                if self._reply_complete(parts, budget):
+                    # Long enough to arrive in time here: end with this sentence
+                    break
+
+        except Exception as e:
+            if not parts:
+                yield f"Sorry, I'm having trouble connecting. Make sure Ollama is running. Error: {str(e)}", False
+                return
+        finally:
+            # Closes the request if we stopped early
+            await stream.aclose()
+
+        # Keep whatever was generated, even if the stream broke off
+        if parts:
+            self._add_assistant_message(''.join(parts))
+
+    async def _key_moments(self, chunk):
+        """Map step: the key moments in one chunk, or the chunk itself on failure"""
+        prompt = f"""Here is part of what someone told you about their day.
+List the key moments as short bullet points, in order. Keep specific details, names, feelings and any memorable wording they used.
+
+{chunk}
+
+Key moments:"""
+
+        try:
+            return (await self._complete([{'role': 'user', 'content': prompt}], self.writer_model, 'key_moments')).strip()
+        except Exception as e:
+            # Never lose part of the day: use their own words instead
+            return chunk
+
+    async def _journal_source(self):
+        conversation_content = self._conversation_content()
+        if estimate_tokens(conversation_content) <= MAP_REDUCE_THRESHOLD:
+            return 'Conversation', conversation_content
+
+        chunks = self._segment_conversation()
+        limit = asyncio.Semaphore(MAP_WORKERS)
+        
+        async def key_moments(chunk):
+            async with limit:
+                return await self._key_moments(chunk)
+        
+        moments = await asyncio.gather(*(key_moments(chunk) for chunk in chunks))
+        return 'Key moments from the conversation, in order', '\n\n'.join(moments)
+
+    async def _journal_request(self):
+        await asyncio.to_thread(self.style_ready.wait, STYLE_WAIT)
+        if self.drafter is not None:
+            # finish() waits for a running draft update, so keep it off the loop
+            draft, remaining = await asyncio.to_thread(self.drafter.finish)
+            if draft:
+                remaining = [msg for msg in remaining if not self._is_end_message(msg)]
+                return self._polish_messages(draft, remaining)
+
+        label, source = await self._journal_source()
+        return self._journal_messages(source, label)
+
+    async def generate_journal_entry(self):
+        """Generate a journal entry from the conversation"""
+        conversation_content = self._conversation_content()
+
+        try:
+            return await self._complete(await self._journal_request(), self.writer_model, 'entry')
+        except Exception as e:
+            # Fallback: just combine user messages
+            return conversation_content
+
+    async def generate_journal_entry_stream(self):
+        """Generate a journal entry from the conversation, yielding it in chunks"""
+        conversation_content = self._conversation_content()
+
+        generated = False
+        try:
+            async for chunk in self._stream(await self._journal_request(), self.writer_model, 'entry'):
+                generated = True
+                yield chunk
+
+        except Exception as e:
+            # Fallback: just combine user messages
+            if not generated:
+                yield conversation_content
+                return
+            yield INTERRUPTED_NOTE + conversation_content
+            raise EntryInterrupted(str(e)) from e
@@ -0,0 +1,90 @@
+import threading
+
+# Rough token estimate: ~4 characters per token plus per-message overhead
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text):
+    """Cheap token estimate for a piece of text"""
+    return len(text) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD
+
+
+class ContextWindow:
+    """Keeps the chat prompt under a token budget however long the chat gets
+
+    The last few turns are sent verbatim. Older messages are folded into a
+    running summary on a background thread, so a turn never waits for it.
+    """
+
+    def __init__(self, summarize, token_budget=1500, keep_turns=6):
+        # summarize(previous_summary, messages) -> new summary text
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self._lock = threading.Lock()
+        self._worker = None
+        self._generation = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the summary (new conversation)"""
+        with self._lock:
+            self.summary = ''
+            self.summarized = 0  # history messages folded into the summary
+            self._generation += 1
+
+    def build(self, system_prompt, history):
+        """Build the message list for a chat turn"""
+        with self._lock:
+            summary = self.summary
+            start = self.summarized
+
+        system_content = system_prompt
+        if summary:
+            system_content += f"\n\nWhat they've told you earlier in this conversation:\n{summary}"
+
+        budget = self.token_budget - estimate_tokens(system_content)
+
+        # Walk back from the newest message, keeping whole messages while they fit
+        recent = history[start:]
+        kept = []
+        for message in reversed(recent[-2 * self.keep_turns:]):
+            cost = estimate_tokens(message['content'])
+            if kept and cost > budget:
+                break
+            kept.append(message)
+            budget -= cost
+        kept.reverse()
+
+        # Anything older than what we kept gets summarized in the background
+        cutoff = len(history) - len(kept)
+        if cutoff > start:
+            self._fold(history[start:cutoff], cutoff)
+
+        return [{'role': 'system', 'content': system_content}] + kept
+
+    def _fold(self, messages, cutoff):
+        """Start summarizing messages unless a summary is already being written"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+
+        generation = self._generation
+        self._worker = threading.Thread(
+            target=self._run_fold, args=(messages, cutoff, generation), daemon=True
+        )
+        self._worker.start()
+
+    def _run_fold(self, messages, cutoff, generation):
+        try:
+            summary = self.summarize(self.summary, messages)
+        except Exception as e:
+            # Try again on a later turn
+            print(f"Summary error: {e}")
+            return
+
+        with self._lock:
+            # Drop the result if a new conversation started meanwhile
+            if generation == self._generation and cutoff > self.summarized:
+                self.summary = summary
+                self.summarized = cutoff
@@ -0,0 +1,259 @@
+import heapq
+import itertools
+import json
+import queue
+import threading
+from contextlib import contextmanager
+
+# Lower runs first
+PRIORITY_CHAT = 0         # the user is waiting on this turn
+PRIORITY_GENERATION = 1   # writing the journal entry
+PRIORITY_BACKGROUND = 2   # summaries, speculative drafts
+
+_DONE = object()
+
+# Counters Ollama reports on the final chunk of a reply
+STAT_KEYS = ('prompt_eval_count', 'prompt_eval_duration', 'eval_count', 'eval_duration',
+             'load_duration', 'total_duration', 'done_reason')
+
+
+class RequestCancelled(Exception):
+    """Raised when waiting on a request that was cancelled"""
+
+
+class LLMRequest:
+    """A queued Ollama chat request
+
+    Use result() for the full reply, or iterate it for streamed chunks
+    (shaped like ollama's own stream parts).
+    """
+
+    def __init__(self, priority, seq, model, messages, stream, options):
+        self.priority = priority
+        self.seq = seq
+        self.model = model
+        self.messages = messages
+        self.stream = stream
+        self.options = options
+        self.key = None
+        self.cancelled = False
+        self._chunks = queue.Queue()
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+        self._callbacks = []
+        # Ollama's counters from the last chunk (eval_count, eval_duration, done_reason, ...)
+        self.stats = {}
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def cancel(self):
+        """Cancel the request; an in-flight stream is closed at the next chunk"""
+        self.cancelled = True
+
+    def done(self):
+        return self._done.is_set()
+
+    def add_done_callback(self, callback):
+        """Call callback(request) on the worker thread once the request finishes"""
+        self._callbacks.append(callback)
+
+    def result(self, timeout=None):
+        """Wait for the full reply text"""
+        self._done.wait(timeout)
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def __iter__(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is _DONE:
+                break
+            yield {'message': {'content': chunk}}
+        if self._error is not None:
+            raise self._error
+
+    def _finish(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._done.set()
+        self._chunks.put(_DONE)
+        for callback in self._callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Request callback error: {e}")
+
+
+class LLMDispatcher:
+    """Single queue in front of Ollama
+
+    A local Ollama instance serves one request well at a time, so every
+    request goes through one long-lived worker thread and HTTP client, in
+    priority order. Identical non-streaming requests that are still queued
+    or running are coalesced, and a background request is preempted (and
+    re-queued) when an interactive turn arrives.
+    """
+
+    def __init__(self, client=None):
+        # Created on the worker thread: importing ollama takes a while
+        self.client = client
+        self._queue = []
+        self._pending = {}  # coalescing key -> request
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._current = None
+        self._preempt = False
+        self._holds = 0
+        self._worker = None  # started by the first request
+
+    def submit(self, messages, model, priority=PRIORITY_CHAT, stream=False, **options):
+        """Queue a chat request and return its LLMRequest"""
+        with self._condition:
+            key = None
+            if not stream:
+                key = json.dumps([model, messages, options], sort_keys=True, default=str)
+                existing = self._pending.get(key)
+                if existing is not None and not existing.cancelled:
+                    if priority < existing.priority:
+                        # A more urgent caller waits on it now, so it can't stay a background job
+                        existing.priority = priority
+                        if existing is not self._current:
+                            heapq.heapify(self._queue)
+                    return existing
+
+            request = LLMRequest(priority, next(self._counter), model, messages, stream, options)
+            if key is not None:
+                request.key = key
+                self._pending[key] = request
+
+            heapq.heappush(self._queue, request)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+            current = self._current
+            if current is not None and current.priority == PRIORITY_BACKGROUND and priority < current.priority:
+                self._preempt = True
+            self._condition.notify()
+            return request
+
+    def cancel_all(self, priority=None):
+        """Cancel queued and running requests (optionally only of one priority)"""
+        with self._condition:
+            requests = list(self._queue)
+            if self._current is not None:
+                requests.append(self._current)
+            for request in requests:
+                if priority is None or request.priority == priority:
+                    request.cancel()
+
+    @contextmanager
+    def hold(self):
+        """Keep background requests off Ollama while work outside the queue runs
+
+        Used by callers with their own connection (e.g. AsyncLLMHandler).
+        """
+        with self._condition:
+            self._holds += 1
+            current = self._current
+            if current is not None and current.priority == PRIORITY_BACKGROUND:
+                self._preempt = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._holds -= 1
+                self._condition.notify()
+
+    def _next_request(self):
+        with self._condition:
+            while True:
+                while self._queue and self._queue[0].cancelled:
+                    self._forget(heapq.heappop(self._queue))._finish(error=RequestCancelled())
+                held = self._holds and self._queue and self._queue[0].priority == PRIORITY_BACKGROUND
+                if self._queue and not held:
+                    request = heapq.heappop(self._queue)
+                    self._current = request
+                    self._preempt = False
+                    return request
+                self._condition.wait()
+
+    def _forget(self, request):
+        if request.key is not None and self._pending.get(request.key) is request:
+            del self._pending[request.key]
+        return request
+
+    def _connect(self):
+        try:
+            import ollama
+            self.client = ollama.Client()
+        except Exception as e:
+            return e
+        return None
+
+    def _run(self):
+        error = self._connect() if self.client is None else None
+        while True:
+            request = self._next_request()
+            if error is not None:
+                with self._condition:
+                    self._current = None
+                    self._forget(request)
+                request._finish(error=error)
+                continue
+
+            parts = []
+            preempted = False
+            try:
+                # Always stream from Ollama so a request can be stopped between chunks
+                stream = self.client.chat(
+                    model=request.model, messages=request.messages, stream=True, **request.options
+                )
+                for part in stream:
+                    if request.cancelled:
+                        break
+                    if self._preempt:
+                        preempted = True
+                        break
+                    chunk = part['message']['content']
+                    if chunk:
+                        parts.append(chunk)
+                        if request.stream:
+                            request._chunks.put(chunk)
+                    if part.get('done'):
+                        request.stats = {key: part.get(key) for key in STAT_KEYS}
+                stream.close()
+            except Exception as e:
+                with self._condition:
+                    self._current = None
+                    self._forget(request)
+                request._finish(error=e)
+                continue
+
+            with self._condition:
+                self._current = None
+                if preempted and not request.stream:
+                    # Start over once the more urgent work is done
+                    heapq.heappush(self._queue, request)
+                    continue
+                self._forget(request)
+
+            if request.cancelled:
+                request._finish(result=''.join(parts), error=RequestCancelled())
+            else:
+                request._finish(result=''.join(parts))
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """The process-wide dispatcher, started on first use"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = LLMDispatcher()
+        return _dispatcher
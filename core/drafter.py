@@ -0,0 +1,83 @@
+import threading
+from core.dispatcher import PRIORITY_BACKGROUND
+
+# Seconds the chat has to be idle before the draft is updated
+IDLE_DELAY = 4.0
+
+
+class SpeculativeDrafter:
+    """Keeps a journal draft up to date in the background while the user chats
+
+    After each turn, once the chat has been idle for a moment, the newest
+    user messages are folded into the previous draft. When the conversation
+    ends, the entry only needs a short polish pass over the draft.
+    """
+
+    def __init__(self, llm_handler, idle_delay=IDLE_DELAY):
+        self.llm_handler = llm_handler
+        self.idle_delay = idle_delay
+        self._lock = threading.Lock()  # held while a draft update runs
+        self._timer = None
+        self.reset()
+
+    def reset(self):
+        """Drop the draft (new conversation)"""
+        self.cancel()
+        with self._lock:
+            self.draft = ''
+            self.drafted = 0  # history messages already folded into the draft
+
+    def cancel(self):
+        """Cancel a scheduled (not yet started) update"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def on_idle(self):
+        """Schedule an update for when the chat goes quiet"""
+        self.cancel()
+        self._timer = threading.Timer(self.idle_delay, self.update)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _new_messages(self, history):
+        return [msg['content'] for msg in history[self.drafted:] if msg['role'] == 'user']
+
+    def update(self):
+        """Fold the newest user messages into the draft"""
+        with self._lock:
+            history = list(self.llm_handler.conversation_history)
+            new_messages = self._new_messages(history)
+            if not new_messages:
+                return
+
+            prompt = f"""You are keeping a running draft of someone's journal entry while they tell you about their day.
+
+Style Instructions:
+{self.llm_handler.style_instructions}
+
+Draft so far:
+{self.draft or '(nothing yet)'}
+
+New things they just told you:
+{chr(10).join(new_messages)}
+
+Rewrite the draft so it includes the new details, in first person and in their voice. Return only the updated draft."""
+
+            try:
+                response = self.llm_handler.ollama_chat([
+                    {'role': 'system', 'content': 'You are a skilled writer who transforms conversations into authentic journal entries.'},
+                    {'role': 'user', 'content': prompt}
+                ], priority=PRIORITY_BACKGROUND, task='draft')
+            except Exception as e:
+                print(f"Draft update error: {e}")
+                return
+
+            self.draft = response['message']['content'].strip()
+            self.drafted = len(history)
+
+    def finish(self):
+        """Wait for any running update and return (draft, messages not in it yet)"""
+        self.cancel()
+        with self._lock:
+            return self.draft, self._new_messages(self.llm_handler.conversation_history)
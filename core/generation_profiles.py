@@ -0,0 +1,177 @@
+import atexit
+import json
+import os
+import statistics
+import threading
+from pathlib import Path
+from core.context_window import estimate_tokens
+
+# Context sizes we pick from. Ollama restarts a model's runner whenever
+# num_ctx changes, so sizes are bucketed and never shrink within a session.
+CTX_BUCKETS = (2048, 4096, 8192, 16384)
+# A chat reply should be finished within this many seconds
+CHAT_LATENCY_TARGET = 3.0
+# Measurements kept per model and task
+HISTORY_SIZE = 50
+# Measurements are written this long after the last recorded request (seconds)
+SAVE_DELAY = 2.0
+
+# Defaults per task: expected reply length and hard cap (tokens, -1 for none), stop sequences.
+# The entry is never capped: a cut-off entry would be saved to the vault as is.
+PROFILES = {
+    'chat': {'expected': 60, 'num_predict': 150, 'min_budget': 40,
+             'stop': ['\nYou:', '\nThem:', '\nUser:', '\nAssistant:']},
+    'summary': {'expected': 200, 'num_predict': 400, 'stop': ['\n\nNew messages:']},
+    'draft': {'expected': 500, 'num_predict': 1000, 'stop': []},
+    'key_moments': {'expected': 200, 'num_predict': 400, 'stop': ['\n\nKey moments:']},
+    'entry': {'expected': 600, 'num_predict': -1, 'stop': []},
+}
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class GenerationProfiles:
+    """Per-task Ollama options, tuned from latencies measured in earlier sessions
+
+    - num_ctx fits the prompt plus the expected reply, rounded up to a
+      bucket that only ever grows for a model (so the model isn't reloaded)
+    - num_predict caps chat replies and background jobs (never the entry);
+      on slow machines reply_budget() asks chat replies to end early, at
+      a sentence boundary
+    - stop sequences keep chat replies from running into a made-up dialogue
+
+    Measurements are kept in ~/.journal-buddy/generation_stats.json,
+    written a moment after the last request rather than after each one.
+    """
+
+    def __init__(self, stats_file=None):
+        if stats_file is None:
+            stats_file = Path.home() / '.journal-buddy' / 'generation_stats.json'
+        self.stats_file = Path(stats_file)
+        self.stats_file.parent.mkdir(exist_ok=True)
+        self._lock = threading.Lock()
+        self._ctx = {}  # model -> num_ctx used so far this session
+        self._dirty = False
+        self._save_timer = None
+        self.load()
+        # Don't lose measurements still waiting to be written
+        atexit.register(self.save)
+
+    def load(self):
+        """Load recorded measurements"""
+        self.history = {}   # "model|task" -> list of records
+        if self.stats_file.exists():
+            try:
+                with open(self.stats_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.history = data.get('history', {})
+            except (OSError, ValueError) as e:
+                print(f"Generation stats error: {e}")
+
+    def save(self):
+        """Write pending measurements now (atomically)"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            
+            tmp_file = self.stats_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'history': self.history}, f)
+            os.replace(tmp_file, self.stats_file)
+            self._dirty = False
+
+    def _changed(self):
+        """Schedule a debounced save (caller holds the lock)"""
+        self._dirty = True
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(SAVE_DELAY, self.save)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def _records(self, model, task):
+        return self.history.get(f'{model}|{task}', [])
+
+    def _prompt_tokens(self, model, messages):
+        """Estimated prompt tokens, corrected upward if past estimates ran low
+
+        Never corrected downward: Ollama's prompt cache makes prompt_eval_count
+        undercount, and an undersized context silently truncates the prompt.
+        """
+        estimate = sum(estimate_tokens(msg['content']) for msg in messages)
+        ratios = [r['prompt'] / r['estimate'] for task in PROFILES
+                  for r in self._records(model, task) if r.get('prompt') and r.get('estimate')]
+        if ratios:
+            estimate = int(estimate * max(1.0, statistics.median(ratios)))
+        return estimate
+
+    def _expected_output(self, model, task):
+        outputs = [r['output'] for r in self._records(model, task) if r.get('output')]
+        if len(outputs) >= 3:
+            return _percentile(outputs, 0.9)
+        return PROFILES[task]['expected']
+
+    def reply_budget(self, task, model):
+        """Tokens after which a reply should end at its next sentence boundary, or None
+
+        On a slow machine a chat reply is kept short enough to arrive in
+        time. Unlike a lower num_predict, this never cuts a sentence off.
+        """
+        profile = PROFILES[task]
+        if 'min_budget' not in profile:
+            return None
+        rates = [r['output'] / r['seconds'] for r in self._records(model, task)
+                 if r.get('output') and r.get('seconds')]
+        if not rates:
+            return None
+        fits = int(statistics.median(rates) * CHAT_LATENCY_TARGET)
+        if fits >= profile['num_predict']:
+            return None
+        return max(profile['min_budget'], fits)
+
+    def _num_ctx(self, model, needed):
+        # Start from the largest context this model needed in earlier sessions
+        with self._lock:
+            if model not in self._ctx:
+                past = [r['prompt'] + r['output'] for task in PROFILES
+                        for r in self._records(model, task) if r.get('prompt') and r.get('output')]
+                self._ctx[model] = max(past, default=0)
+            needed = max(needed, self._ctx[model])
+            size = next((bucket for bucket in CTX_BUCKETS if bucket >= needed), CTX_BUCKETS[-1])
+            self._ctx[model] = max(self._ctx[model], size)
+            return size
+
+    def options(self, task, model, messages):
+        """Ollama options for one request"""
+        num_predict = PROFILES[task]['num_predict']
+        prompt = self._prompt_tokens(model, messages)
+        expected = max(self._expected_output(model, task), PROFILES[task]['expected'])
+        needed = prompt + (expected if num_predict < 0 else min(num_predict, expected))
+        options = {'num_ctx': self._num_ctx(model, needed), 'num_predict': num_predict}
+        if PROFILES[task]['stop']:
+            options['stop'] = PROFILES[task]['stop']
+        return options
+
+    def record(self, task, model, messages, stats):
+        """Remember how a finished request went"""
+        if not stats or not stats.get('eval_count'):
+            return
+
+        key = f'{model}|{task}'
+        record = {
+            'estimate': sum(estimate_tokens(msg['content']) for msg in messages),
+            'prompt': stats.get('prompt_eval_count') or 0,
+            'output': stats['eval_count'],
+            'seconds': (stats.get('eval_duration') or 0) / 1e9,
+        }
+        with self._lock:
+            records = self.history.setdefault(key, [])
+            records.append(record)
+            del records[:-HISTORY_SIZE]
+            self._changed()
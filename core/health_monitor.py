@@ -0,0 +1,106 @@
+import threading
+import time
+import ollama
+
+# Seconds between probes while Ollama is up
+HEALTHY_INTERVAL = 30
+# Retry delays while it is down: doubles from BACKOFF_START up to BACKOFF_MAX
+BACKOFF_START = 1
+BACKOFF_MAX = 60
+# A probe that takes longer than this counts as down
+PROBE_TIMEOUT = 3
+
+
+class OllamaStatus:
+    """One probe result: whether Ollama answered and which models it has"""
+
+    def __init__(self, reachable=None, models=(), error=''):
+        self.reachable = reachable  # None until the first probe finishes
+        self.models = tuple(models)
+        self.error = error
+        self.checked = time.monotonic()
+
+    @property
+    def connecting(self):
+        return self.reachable is None
+
+    def has_model(self, model):
+        """Whether a model is installed ('llama3.1' matches 'llama3.1:latest')"""
+        if ':' not in model:
+            model += ':latest'
+        return model in self.models
+
+    def describe(self):
+        """Short human-readable status"""
+        if self.connecting:
+            return 'Connecting to Ollama...'
+        if self.reachable:
+            return f'Ollama connected ({len(self.models)} models)'
+        return 'Ollama is not running (start it with: ollama serve)'
+
+
+class HealthMonitor:
+    """Probes Ollama in the background and caches the result
+
+    Nothing on the GUI thread waits on the network: callers read `status`
+    or register a listener. Listeners are called from the monitor thread,
+    so GUI code should hand the status to the main thread via a signal.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or ollama.Client(timeout=PROBE_TIMEOUT)
+        self.status = OllamaStatus()
+        self._listeners = []
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start probing (no-op if already running)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def add_listener(self, callback):
+        """Call callback(status) now and after every change"""
+        self._listeners.append(callback)
+        callback(self.status)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def check_now(self):
+        """Probe again right away instead of waiting out the interval or backoff"""
+        self.start()
+        self._wake.set()
+
+    def _probe(self):
+        try:
+            response = self.client.list()
+        except Exception as e:
+            return OllamaStatus(False, error=str(e))
+        models = [model.get('model') or model.get('name') for model in response['models']]
+        return OllamaStatus(True, models)
+
+    def _run(self):
+        delay = BACKOFF_START
+        while True:
+            status = self._probe()
+            changed = (status.reachable, status.models) != (self.status.reachable, self.status.models)
+            self.status = status
+            if changed:
+                for callback in list(self._listeners):
+                    try:
+                        callback(status)
+                    except Exception as e:
+                        print(f"Health listener error: {e}")
+
+            if status.reachable:
+                delay = BACKOFF_START
+                wait = HEALTHY_INTERVAL
+            else:
+                wait = delay
+                delay = min(delay * 2, BACKOFF_MAX)
+
+            self._wake.wait(wait)
+            self._wake.clear()
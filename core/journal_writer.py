@@ -1,51 +1,76 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+import os
 import re
+import shutil
+import threading
+import time
+from core.template import CompiledTemplate, load_template, moon_phase
+from utils.vault_index import VaultIndex
 
-class JournalWriter:
-    def __init__(self, vault_path):
-        self.vault_path = Path(vault_path)
-        self.template = self._load_template()
-    
-    def _load_template(self):
-        """Load the journal template"""
-        return """---
+# How many times to retry a rewrite when the note changes underneath us
+WRITE_RETRIES = 3
+# Lines that open or close a fenced code block (a "# " inside one is not a heading)
+CODE_FENCE = re.compile(r'^\s*(```|~~~)')
+# A draft is flushed to disk at most this often, so a synced vault doesn't upload every token (seconds)
+DRAFT_FLUSH_INTERVAL = 0.3
+# Sidecar drafts: .YYYY-MM-DD.md.draft, or .YYYY-MM-DD-N.md.draft while another is in use
+DRAFT_NAME = re.compile(r'^\.(\d{4}-\d{2}-\d{2})(?:-(\d+))?\.md\.draft$')
+# A draft changed this recently may be streaming in another process (seconds)
+DRAFT_IDLE = 120
+
+# Drafts started in this process and not yet saved or discarded; recovery leaves them alone
+_own_drafts = set()
+_drafts_lock = threading.RLock()
+
+
+def _draft_in_use(path):
+    """Whether a draft may still be written to, by this process or another one"""
+    with _drafts_lock:
+        if str(path) in _own_drafts:
+            return True
+    try:
+        return time.time() - os.stat(path).st_mtime < DRAFT_IDLE
+    except OSError:
+        return False
+
+DEFAULT_TEMPLATE = """---
 cssclasses:
-  - "{day_name}"
+  - "{{day_name}}"
   - cards
   - daily
 reading: false
 EarlyWakeUp: "False"
 productivity: 0
 journal: Personal
-journal-start-date: {date}
-journal-end-date: {date}
+journal-start-date: {{date}}
+journal-end-date: {{date}}
 journal-section: day
 ---
 #dailyjournal 
 # DAILY NOTE
 ---
-### _{formatted_date}_
+### _{{formatted_date}}_
 ## Daily Journal
 ## <font color="#d99694">Essence: </font>
 
-[[<{yesterday_date}> | Yesterday]] | [[<{tomorrow_date}> | Tomorrow ]]
+[[<{{yesterday_date}}> | Yesterday]] | [[<{{tomorrow_date}}> | Tomorrow ]]
 
 >[!multi-column]
 >>[!todo]- Tasks Due Today 
 >>```tasks not done 
->>due {date} 
+>>due {{date}} 
 >>hide due date```
 >
 >>[!danger]- Overdue Tasks
 >>```tasks
 >>not done 
->>due < {date} 
+>>due < {{date}} 
 >>hide due date```
 >
 >>[!success]- Completed Tasks
 >>```tasks
->>done {date}```
+>>done {{date}}```
 
 ![[Calendar View]]
 
@@ -78,35 +103,171 @@ journal-section: day
 # New Tasks
 
 # Logs
-{journal_content}
+{{journal_content}}
 """
+
+# Compiled once per process
+_default_template = CompiledTemplate(DEFAULT_TEMPLATE)
+
+
+class JournalDraft:
+    """Sidecar file that a streamed journal entry is written into as it arrives"""
+    
+    def __init__(self, path, date):
+        self.path = Path(path)
+        self.date = date
+        self._file = None
+        self._last_flush = 0.0
+        # Set once writing failed; the entry is then saved from memory instead
+        self.abandoned = False
+    
+    def write(self, chunk):
+        """Append a chunk of the entry, flushing it to disk every few hundred ms"""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(chunk)
+        # A crash loses at most the last flush interval
+        now = time.monotonic()
+        if now - self._last_flush >= DRAFT_FLUSH_INTERVAL:
+            self._file.flush()
+            self._last_flush = now
+    
+    def close(self):
+        """Close the sidecar file"""
+        if self._file is not None:
+            file, self._file = self._file, None
+            file.close()
+    
+    def abandon(self):
+        """Give up on the sidecar after a write error (best effort removal)"""
+        self.abandoned = True
+        try:
+            self.discard()
+        except OSError as e:
+            print(f"Draft cleanup error: {e}")
+    
+    def read(self):
+        """Read the full draft content"""
+        self.close()
+        if not self.path.exists():
+            return ''
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    def discard(self):
+        """Delete the sidecar file"""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+        with _drafts_lock:
+            _own_drafts.discard(str(self.path))
+
+
+def demote_headings(content):
+    """Turn an entry's top-level headings into second-level ones
+
+    A "# " heading inside an entry would end the note's "# Logs" section
+    early, and the next entry would be spliced into the middle of it.
+    """
+    lines = content.split('\n')
+    in_code = False
+    for i, line in enumerate(lines):
+        if CODE_FENCE.match(line):
+            in_code = not in_code
+        elif not in_code and line.startswith('# '):
+            lines[i] = '#' + line
+    return '\n'.join(lines)
+
+
+def write_draft(draft, chunk):
+    """Write a chunk into the sidecar draft; if that fails the draft is dropped, not the entry"""
+    if draft is None or draft.abandoned:
+        return
+    try:
+        draft.write(chunk)
+    except OSError as e:
+        print(f"Draft error, continuing without it: {e}")
+        draft.abandon()
+
+
+def close_draft(draft):
+    """Close the sidecar draft, dropping it if its last flush fails"""
+    if draft is None or draft.abandoned:
+        return
+    try:
+        draft.close()
+    except OSError as e:
+        print(f"Draft error, continuing without it: {e}")
+        draft.abandon()
+
+
+class JournalWriter:
+    DRAFT_SUFFIX = '.draft'
+    
+    def __init__(self, vault_path, style_analyzer=None, index=None, append_in_place=True,
+                 template_path=None, search_index=None):
+        self.vault_path = Path(vault_path)
+        self.style_analyzer = style_analyzer
+        self.index = index
+        # Optional SearchIndex, kept up to date with every entry written
+        self.search_index = search_index
+        # True: add new entries at the end of "# Logs" (usually a plain append).
+        # False: newest entry first, right under the heading (rewrites the note).
+        self.append_in_place = append_in_place
+        # path -> (mtime_ns, size, heading_end, section_end) of the "# Logs" section
+        self._logs_offsets = {}
+        self.set_template_path(template_path)
+    
+    def set_template_path(self, template_path):
+        """Use a template note, relative to the vault or absolute (e.g. Templates/Daily.md); empty for the built-in one"""
+        self.template_path = self.vault_path / template_path if template_path else None
+    
+    def _load_template(self):
+        """Load the journal template (a template note if configured, else the built-in one)"""
+        if self.template_path is not None:
+            try:
+                return load_template(self.template_path)
+            except OSError as e:
+                print(f"Template error, using the default template: {e}")
+        
+        return _default_template
+    
+    def _template_values(self, template, date, content):
+        """Compute only the placeholder values the template actually uses"""
+        builders = {
+            'day_name': lambda: date.strftime('%A'),
+            'date': lambda: date.strftime('%Y-%m-%d'),
+            'title': lambda: date.strftime('%Y-%m-%d'),
+            'time': lambda: datetime.now().strftime('%H:%M'),
+            'formatted_date': lambda: date.strftime('%A, %B %d, %Y'),
+            'yesterday_date': lambda: (date - timedelta(days=1)).strftime('%Y-%m-%d'),
+            'tomorrow_date': lambda: (date + timedelta(days=1)).strftime('%Y-%m-%d'),
+            'journal_content': lambda: content,
+            'week_number': lambda: f"{date.isocalendar()[1]:02d}",
+            'moon_phase': lambda: moon_phase(date),
+            'previous_entry': lambda: self._entry_link(self._get_index().before(date)),
+            'next_entry': lambda: self._entry_link(self._get_index().after(date)),
+        }
+        return {name: builders[name]() for name in template.names if name in builders}
+    
+    def _get_index(self):
+        """The vault index, built on first use if none was passed in"""
+        if self.index is None:
+            self.index = VaultIndex(self.vault_path)
+        self.index.refresh()
+        return self.index
+    
+    def _entry_link(self, entry_date):
+        """Obsidian link to a daily note, or nothing if there isn't one"""
+        if entry_date is None:
+            return ''
+        return f"[[{entry_date.strftime('%Y-%m-%d')}]]"
     
     def create_journal_entry(self, content, date=None):
         """Create a journal entry with the given content"""
         if date is None:
             date = datetime.now()
-        
-        # Format dates
-        date_str = date.strftime('%Y-%m-%d')
-        day_name = date.strftime('%A')
-        formatted_date = date.strftime('%A, %B %d, %Y')
-        
-        # Calculate yesterday and tomorrow
-        from datetime import timedelta
-        yesterday = date - timedelta(days=1)
-        tomorrow = date + timedelta(days=1)
-        yesterday_str = yesterday.strftime('%Y-%m-%d')
-        tomorrow_str = tomorrow.strftime('%Y-%m-%d')
-        
-        # Fill in the template
-        journal_text = self.template.format(
-            day_name=day_name,
-            date=date_str,
-            formatted_date=formatted_date,
-            yesterday_date=yesterday_str,
-            tomorrow_date=tomorrow_str,
-            journal_content=content
-        )
+        content = demote_headings(content)
         
         # Create filename in YYYY-MM-DD format
         filename = date.strftime('%Y-%m-%d') + '.md'
@@ -114,36 +275,221 @@ journal-section: day
         
         # Check if file already exists
         if filepath.exists():
-            # Append to existing file under Logs section
-            with open(filepath, 'r', encoding='utf-8') as f:
-                existing_content = f.read()
-            
-            # Find the Logs section and append
-            if '# Logs' in existing_content:
-                # Add timestamp for multiple entries
-                timestamp = datetime.now().strftime('%H:%M')
-                new_entry = f"\n##### Time - {timestamp}\n{content}\n"
-                
-                updated_content = existing_content.replace(
-                    '# Logs\n',
-                    f'# Logs\n{new_entry}'
-                )
-                
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(updated_content)
-            else:
-                # Just append at the end
-                with open(filepath, 'a', encoding='utf-8') as f:
-                    f.write(f"\n\n{content}")
+            # Add timestamp for multiple entries
+            timestamp = datetime.now().strftime('%H:%M')
+            new_entry = f"\n##### Time - {timestamp}\n{content}\n"
+            self._add_to_existing(filepath, new_entry, content)
         else:
+            # Fill in the template
+            template = self._load_template()
+            journal_text = template.render(self._template_values(template, date, content))
+            if 'journal_content' not in template.names:
+                # Most daily-note templates have no slot for the entry
+                journal_text = self._with_logs_entry(journal_text, content)
+            
             # Create new file
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(journal_text)
+            
+            if self.index is not None:
+                self.index.add(date)
+        
+        # Keep the cached style profile in step with the vault
+        if self.style_analyzer is not None:
+            self.style_analyzer.update_file(filepath)
+        if self.search_index is not None:
+            self.search_index.update_file(filepath)
         
         return filepath
     
+    def _scan_logs(self, lines):
+        """Find the "# Logs" section in an iterable of byte lines
+
+        Returns (heading_end, section_end) byte offsets, or None if the note
+        has no Logs heading. The section ends at the next top-level heading
+        (not counting "# " lines in code blocks) or at the end of the note.
+        """
+        offset = 0
+        heading_end = None
+        in_code = False
+        for line in lines:
+            if heading_end is None:
+                if line.rstrip(b'\r\n') == b'# Logs':
+                    heading_end = offset + len(line)
+            elif line.lstrip().startswith((b'```', b'~~~')):
+                in_code = not in_code
+            elif not in_code and line.startswith(b'# '):
+                return heading_end, offset
+            offset += len(line)
+        
+        if heading_end is None:
+            return None
+        return heading_end, offset
+    
+    def _with_logs_entry(self, text, content):
+        """Put an entry into a note's "# Logs" section, adding the section if there is none"""
+        data = text.encode('utf-8')
+        offsets = self._scan_logs(data.splitlines(keepends=True))
+        if offsets is None:
+            return text.rstrip('\n') + f"\n\n# Logs\n{content}\n"
+        
+        position = offsets[1] if self.append_in_place else offsets[0]
+        prefix = b'' if position == 0 or data[position - 1:position] == b'\n' else b'\n'
+        return (data[:position] + prefix + content.encode('utf-8') + b'\n' + data[position:]).decode('utf-8')
+    
+    def _find_logs(self, filepath, stat):
+        """Logs section offsets, cached until the note's mtime or size changes"""
+        key = str(filepath)
+        cached = self._logs_offsets.get(key)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2:]
+        
+        with open(filepath, 'rb') as f:
+            offsets = self._scan_logs(f)
+        if offsets is not None:
+            self._logs_offsets[key] = (stat.st_mtime_ns, stat.st_size) + offsets
+        return offsets
+    
+    def _remember_append(self, filepath, offsets):
+        """Update the cached offsets after appending to the end of a note"""
+        stat = os.stat(filepath)
+        self._logs_offsets[str(filepath)] = (stat.st_mtime_ns, stat.st_size, offsets[0], stat.st_size)
+    
+    def _append(self, filepath, text):
+        """Append text to the end of a note, starting on a new line"""
+        with open(filepath, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    text = '\n' + text
+            f.write(text.encode('utf-8'))
+    
+    def _add_to_existing(self, filepath, new_entry, content):
+        """Add an entry to an existing note, writing as little as possible"""
+        stat = os.stat(filepath)
+        offsets = self._find_logs(filepath, stat)
+        
+        if offsets is None:
+            # Just append at the end
+            self._append(filepath, f"\n\n{content}")
+            return
+        
+        if self.append_in_place and offsets[1] == stat.st_size:
+            # Logs is the last section: only the new entry's bytes are written
+            self._append(filepath, new_entry)
+            self._remember_append(filepath, offsets)
+            return
+        
+        self._rewrite_with_entry(filepath, new_entry)
+    
+    def _rewrite_with_entry(self, filepath, new_entry):
+        """Splice an entry into the Logs section and atomically replace the note
+
+        The note is re-read if it changes while we are writing, so a
+        concurrent edit (e.g. in Obsidian) is never overwritten.
+        """
+        tmp_path = filepath.with_name('.' + filepath.name + '.tmp')
+        
+        for attempt in range(WRITE_RETRIES):
+            before = os.stat(filepath)
+            with open(filepath, 'rb') as f:
+                data = f.read()
+            
+            offsets = self._scan_logs(data.splitlines(keepends=True))
+            if offsets is None:
+                # The Logs heading was removed meanwhile
+                self._append(filepath, new_entry)
+                return
+            
+            if self.append_in_place:
+                position = offsets[1]
+                prefix = b'' if position == 0 or data[position - 1:position] == b'\n' else b'\n'
+            else:
+                position = offsets[0]
+                prefix = b''
+            updated = data[:position] + prefix + new_entry.encode('utf-8') + data[position:]
+            
+            with open(tmp_path, 'wb') as f:
+                f.write(updated)
+            shutil.copymode(filepath, tmp_path)
+            
+            after = os.stat(filepath)
+            if (after.st_mtime_ns, after.st_size) == (before.st_mtime_ns, before.st_size):
+                os.replace(tmp_path, filepath)
+                return
+        
+        os.remove(tmp_path)
+        raise RuntimeError(f'{filepath.name} kept changing while saving; the entry was not written')
+    
     def get_todays_entry_path(self):
         """Get the path to today's journal entry"""
         today = datetime.now()
         filename = today.strftime('%Y-%m-%d') + '.md'
         return self.vault_path / filename
+    
+    def _draft_path(self, date, number=0):
+        """Hidden sidecar path next to the daily note, e.g. .2026-01-28.md.draft"""
+        number = f'-{number}' if number else ''
+        return self.vault_path / ('.' + date.strftime('%Y-%m-%d') + number + '.md' + self.DRAFT_SUFFIX)
+    
+    def start_draft(self, date=None):
+        """Start a sidecar draft that a streamed entry is written into
+        
+        A draft still being written (e.g. by a window that was closed during
+        generation) is left alone and the new one gets a numbered path.
+        """
+        if date is None:
+            date = datetime.now()
+        
+        with _drafts_lock:
+            number = 0
+            while _draft_in_use(self._draft_path(date, number)):
+                number += 1
+            draft = JournalDraft(self._draft_path(date, number), date)
+            if draft.path.exists():
+                # Leftover from an interrupted generation - save it before starting over
+                self.commit_draft(draft)
+            _own_drafts.add(str(draft.path))
+        return draft
+    
+    def commit_draft(self, draft):
+        """Move a finished draft into the daily note in a single write"""
+        content = draft.read().strip()
+        if not content:
+            draft.discard()
+            return None
+        
+        filepath = self.create_journal_entry(content, date=draft.date)
+        draft.discard()
+        return filepath
+    
+    def recover_drafts(self):
+        """Commit drafts left behind by an interrupted generation
+
+        Meant to run once at startup, before anything is generated. Drafts
+        still in use (started by this process, or changed in the last
+        DRAFT_IDLE seconds) are left for later. Returns the paths of the
+        daily notes the drafts were saved into.
+        """
+        drafts = []
+        for path in self.vault_path.glob('.*.md' + self.DRAFT_SUFFIX):
+            match = DRAFT_NAME.match(path.name)
+            if not match:
+                continue
+            try:
+                date = datetime.strptime(match.group(1), '%Y-%m-%d')
+            except ValueError:
+                continue
+            drafts.append((date, int(match.group(2) or 0), path))
+        
+        recovered = []
+        for date, number, path in sorted(drafts):
+            with _drafts_lock:
+                if _draft_in_use(path):
+                    continue
+                filepath = self.commit_draft(JournalDraft(path, date))
+            if filepath:
+                recovered.append(filepath)
+        
+        return recovered
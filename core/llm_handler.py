@@ -1,19 +1,112 @@
-import ollama
+import re
+import threading
 from datetime import datetime
+from core.context_window import ContextWindow, estimate_tokens
+from core.dispatcher import PRIORITY_BACKGROUND, PRIORITY_CHAT, PRIORITY_GENERATION, get_dispatcher
+from core.drafter import SpeculativeDrafter
+from core.model_warmer import ModelWarmer
+
+# Conversations longer than this (in estimated tokens) are written map-reduce style
+MAP_REDUCE_THRESHOLD = 1500
+# Target size of each chunk in the map phase
+CHUNK_TOKENS = 600
+WORD_PATTERN = re.compile(r"[a-z']{4,}")
+# Longest the entry waits for a style analysis still running in the background (seconds)
+STYLE_WAIT = 60
+# A reply that ends like this has finished a sentence
+SENTENCE_END = re.compile(r'[.!?…][\'")\]*]*\s*$')
+# Follows a partial entry, before the user's own messages, when generation broke off
+INTERRUPTED_NOTE = "\n\n*(The entry was cut off here. What you said:)*\n\n"
+
+
+class EntryInterrupted(Exception):
+    """The entry stream broke off after part of the entry was generated
+
+    By then the stream has also yielded the user's own messages, so what
+    was collected is partial but complete. Callers should keep it as a
+    draft rather than save it as a finished entry.
+    """
+
 
 class LLMHandler:
-    def __init__(self, model='llama3.1'):
+    def __init__(self, model='llama3.1', context_budget=1500, keep_turns=6, speculative_drafting=False,
+                 keep_alive=None, dispatcher=None, writer_model=None, profiles=None):
+        # Chat turns use the (small, fast) chat model; the entry is written by the writer model
         self.model = model
+        self.writer_model = writer_model or model
+        # All requests share one queue, worker and HTTP client
+        self.dispatcher = dispatcher or get_dispatcher()
+        # How long Ollama keeps the model loaded after a request (e.g. '10m')
+        self.keep_alive = keep_alive
+        # Optional GenerationProfiles: per-task num_ctx, num_predict and stop sequences
+        self.profiles = profiles
+        self.writer_warmer = ModelWarmer(self.writer_model, keep_alive=keep_alive or '10m')
         self.conversation_history = []
         self.style_instructions = ""
+        # Cleared by expect_style() while the style is analyzed in the background
+        self.style_ready = threading.Event()
+        self.style_ready.set()
+        # Bounds the prompt sent per chat turn; older turns get summarized
+        self.context = ContextWindow(self._summarize, token_budget=context_budget, keep_turns=keep_turns)
+        # Opt-in: draft the entry in the background between turns
+        self.drafter = SpeculativeDrafter(self) if speculative_drafting else None
+    
+    def submit(self, messages, priority=PRIORITY_CHAT, stream=False, model=None, task='chat'):
+        """Queue a chat request with this handler's model settings (chat model by default)"""
+        model = model or self.model
+        kwargs = {}
+        if self.keep_alive is not None:
+            kwargs['keep_alive'] = self.keep_alive
+        if self.profiles is not None:
+            kwargs['options'] = self.profiles.options(task, model, messages)
+        
+        request = self.dispatcher.submit(messages, model, priority=priority, stream=stream, **kwargs)
+        if self.profiles is not None:
+            request.add_done_callback(lambda r: self.profiles.record(task, model, messages, r.stats))
+        return request
+    
+    def ollama_chat(self, messages, stream=False, priority=PRIORITY_CHAT, model=None, task='chat'):
+        """Send a chat request to Ollama and wait for it (or iterate the stream)"""
+        request = self.submit(messages, priority=priority, stream=stream, model=model, task=task)
+        if stream:
+            return request
+        return {'message': {'content': request.result()}}
+    
+    def cancel_chat(self):
+        """Cancel chat turns still queued or streaming (e.g. the window was closed)"""
+        self.dispatcher.cancel_all(PRIORITY_CHAT)
     
     def set_style_instructions(self, instructions):
         """Set writing style instructions from analyzed journals"""
         self.style_instructions = instructions
+        self.style_ready.set()
+    
+    def expect_style(self):
+        """Make entries wait for style instructions that are still being worked out"""
+        self.style_ready.clear()
+    
+    def set_models(self, model, writer_model=None):
+        """Switch the chat and writer models (the conversation carries on)"""
+        writer_model = writer_model or model
+        if writer_model != self.writer_model:
+            self.writer_warmer = ModelWarmer(writer_model, keep_alive=self.keep_alive or '10m')
+        self.model = model
+        self.writer_model = writer_model
+    
+    def set_speculative_drafting(self, enabled):
+        """Turn background drafting on or off (a new drafter catches up on its first update)"""
+        if enabled and self.drafter is None:
+            self.drafter = SpeculativeDrafter(self)
+        elif not enabled and self.drafter is not None:
+            self.drafter.cancel()
+            self.drafter = None
     
     def start_conversation(self):
         """Start a new journaling conversation"""
         self.conversation_history = []
+        self.context.reset()
+        if self.drafter is not None:
+            self.drafter.reset()
         
         # Friendly, varied greetings
         greetings = [
@@ -34,25 +127,8 @@ class LLMHandler:
         
         return greeting
     
-    def chat(self, user_message):
-        """Continue the conversation"""
-        self.conversation_history.append({
-            'role': 'user',
-            'content': user_message
-        })
-        
-        # Check if user wants to end
-        end_phrases = ['that\'s all', 'that is all', 'done', 'finished', 'nothing else', 'bye', 'end']
-        if any(phrase in user_message.lower() for phrase in end_phrases):
-            response = "Got it! Let me write up your journal entry now."
-            self.conversation_history.append({
-                'role': 'assistant',
-                'content': response
-            })
-            return response, True  # True means conversation ended
-        
-        # System prompt for natural conversation
-        system_prompt = """You are a friendly journaling companion. Have a natural, casual conversation to help the person journal about their day.
+    # System prompt for natural conversation
+    CHAT_SYSTEM_PROMPT = """You are a friendly journaling companion. Have a natural, casual conversation to help the person journal about their day.
 
 Guidelines:
 - Ask follow-up questions naturally based on what they share
@@ -66,32 +142,245 @@ Guidelines:
 - If they mention something interesting, dig deeper
 - Don't force structure - just chat naturally"""
 
+    END_PHRASES = ['that\'s all', 'that is all', 'done', 'finished', 'nothing else', 'bye', 'end']
+    # Hints that the conversation is winding down
+    WIND_DOWN_PHRASES = ['anyway', 'that\'s about it', 'not much', 'i think that\'s it', 'going to bed',
+                         'good night', 'tired']
+    END_RESPONSE = "Got it! Let me write up your journal entry now."
+
+    def _add_user_message(self, user_message):
+        """Record the user's message and check if they want to end"""
+        if self.drafter is not None:
+            # The chat isn't idle any more
+            self.drafter.cancel()
+        self.conversation_history.append({
+            'role': 'user',
+            'content': user_message
+        })
+        is_end = self._is_end_message(user_message)
+        self._maybe_preload_writer(user_message, is_end)
+        return is_end
+
+    def _maybe_preload_writer(self, user_message, is_end):
+        """Load the writer model just in time, once the chat looks like it is wrapping up
+
+        Until then only the chat model is in memory. It is loaded again if
+        Ollama has unloaded it since (keep_alive passed) by the time the
+        chat winds down once more.
+        """
+        if self.writer_model == self.model or self.writer_warmer.is_warm():
+            return
+        
+        winding_down = any(phrase in user_message.lower() for phrase in self.WIND_DOWN_PHRASES)
+        if is_end or winding_down:
+            self.writer_warmer.warm()
+
+    def _is_end_message(self, user_message):
+        """Check if a message means the user wants to wrap up"""
+        return any(phrase in user_message.lower() for phrase in self.END_PHRASES)
+
+    def _add_assistant_message(self, content):
+        """Record an assistant reply in the conversation history"""
+        self.conversation_history.append({
+            'role': 'assistant',
+            'content': content
+        })
+        if self.drafter is not None:
+            self.drafter.on_idle()
+
+    def _chat_messages(self):
+        """Build the message list sent to Ollama for a chat turn"""
+        return self.context.build(self.CHAT_SYSTEM_PROMPT, self.conversation_history)
+
+    def _summarize(self, previous_summary, messages):
+        """Fold older chat messages into the running summary (runs in the background)"""
+        transcript = '\n'.join(
+            f"{'Them' if msg['role'] == 'user' else 'You'}: {msg['content']}" for msg in messages
+        )
+        prompt = f"""Update this summary of a journaling chat with the new messages below.
+Keep every concrete detail they shared (people, places, events, feelings). Be brief, use plain notes.
+
+Summary so far:
+{previous_summary or '(nothing yet)'}
+
+New messages:
+{transcript}
+
+Updated summary:"""
+
+        response = self.ollama_chat([{'role': 'user', 'content': prompt}], priority=PRIORITY_BACKGROUND,
+                                    task='summary')
+        return response['message']['content'].strip()
+
+    def chat(self, user_message):
+        """Continue the conversation"""
+        if self._add_user_message(user_message):
+            self._add_assistant_message(self.END_RESPONSE)
+            return self.END_RESPONSE, True  # True means conversation ended
+
         try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {'role': 'system', 'content': system_prompt}
-                ] + self.conversation_history
-            )
+            response = self.ollama_chat(self._chat_messages())
             
             assistant_message = response['message']['content']
-            
-            self.conversation_history.append({
-                'role': 'assistant',
-                'content': assistant_message
-            })
+            self._add_assistant_message(assistant_message)
             
             return assistant_message, False
             
         except Exception as e:
             return f"Sorry, I'm having trouble connecting. Make sure Ollama is running. Error: {str(e)}", False
+
+    def chat_stream(self, user_message):
+        """Continue the conversation, yielding the reply as it is generated
+
+        Yields (chunk, is_done) tuples. The full reply is added to the
+        conversation history once the stream finishes.
+        """
+        if self._add_user_message(user_message):
+            self._add_assistant_message(self.END_RESPONSE)
+            yield self.END_RESPONSE, True
+            return
+
+        parts = []
+        budget = self._reply_budget()
+        try:
+            stream = self.ollama_chat(self._chat_messages(), stream=True)
+
+            for part in stream:
+                chunk = part['message']['content']
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk, False
+                    if self._reply_complete(parts, budget):
+                        # Long enough to arrive in time here: end with this sentence
+                        stream.cancel()
+                        break
+
+        except GeneratorExit:
+            # The caller stopped listening: free Ollama for the next request
+            stream.cancel()
+            raise
+        except Exception as e:
+            if not parts:
+                yield f"Sorry, I'm having trouble connecting. Make sure Ollama is running. Error: {str(e)}", False
+                return
+
+        # Keep whatever was generated, even if the stream broke off
+        if parts:
+            self._add_assistant_message(''.join(parts))
     
-    def generate_journal_entry(self):
-        """Generate a journal entry from the conversation"""
-        # Extract just the user's messages
+    def _reply_budget(self):
+        """Tokens after which a chat reply should stop at its next sentence end (None: no limit)"""
+        if self.profiles is None:
+            return None
+        return self.profiles.reply_budget('chat', self.model)
+    
+    def _reply_complete(self, parts, budget):
+        """Whether a streamed reply is long enough for this machine and has just ended a sentence"""
+        if budget is None or not SENTENCE_END.search(parts[-1]):
+            return False
+        return estimate_tokens(''.join(parts)) >= budget
+    
+    def _conversation_content(self):
+        """Extract just the user's messages from the conversation"""
         user_messages = [msg['content'] for msg in self.conversation_history if msg['role'] == 'user']
-        conversation_content = '\n\n'.join(user_messages)
+        return '\n\n'.join(user_messages)
+
+    def _segment_conversation(self):
+        """Split the user's messages into roughly topical chunks
+
+        A chunk is closed once it is big enough and the next message shares
+        few words with it (a likely topic change), or when it hits the size
+        limit. No message is ever dropped.
+        """
+        chunks = []
+        current, current_words, current_tokens = [], set(), 0
+        
+        for msg in self.conversation_history:
+            if msg['role'] != 'user':
+                continue
+            
+            words = set(WORD_PATTERN.findall(msg['content'].lower()))
+            tokens = estimate_tokens(msg['content'])
+            if current:
+                overlap = len(words & current_words) / max(1, len(words))
+                topic_change = current_tokens >= CHUNK_TOKENS // 2 and overlap < 0.1
+                if topic_change or current_tokens + tokens > CHUNK_TOKENS:
+                    chunks.append('\n\n'.join(current))
+                    current, current_words, current_tokens = [], set(), 0
+            
+            current.append(msg['content'])
+            current_words |= words
+            current_tokens += tokens
+        
+        if current:
+            chunks.append('\n\n'.join(current))
+        return chunks
+    
+    def _extract_key_moments(self, chunk):
+        """Map step: queue a request for the key moments in one chunk of the conversation"""
+        prompt = f"""Here is part of what someone told you about their day.
+List the key moments as short bullet points, in order. Keep specific details, names, feelings and any memorable wording they used.
+
+{chunk}
+
+Key moments:"""
+        
+        return self.submit([{'role': 'user', 'content': prompt}], priority=PRIORITY_GENERATION,
+                           model=self.writer_model, task='key_moments')
+    
+    def _journal_source(self):
+        """What the entry is written from: the raw messages, or key moments for long chats"""
+        conversation_content = self._conversation_content()
+        if estimate_tokens(conversation_content) <= MAP_REDUCE_THRESHOLD:
+            return 'Conversation', conversation_content
+        
+        # Queue every chunk up front; the dispatcher runs them back to back
+        chunks = self._segment_conversation()
+        requests = [self._extract_key_moments(chunk) for chunk in chunks]
+        moments = []
+        for chunk, request in zip(chunks, requests):
+            try:
+                moments.append(request.result().strip())
+            except Exception as e:
+                # Never lose part of the day: use their own words instead
+                moments.append(chunk)
+        return 'Key moments from the conversation, in order', '\n\n'.join(moments)
+    
+    def _polish_messages(self, draft, remaining):
+        """Messages for the final pass over a speculative draft"""
+        extra = ''
+        if remaining:
+            extra = "\n\nThey also said (work it in if it adds anything):\n" + '\n\n'.join(remaining)
+        
+        prompt = f"""Here is a draft of someone's journal entry, written while they told you about their day.
+
+Style Instructions:
+{self.style_instructions}
+
+Draft:
+{draft}{extra}
+
+Polish it into the final journal entry: first person, their natural voice, keep every detail. Write the journal entry now (just the content, no meta-commentary):"""
+        
+        return [
+            {'role': 'system', 'content': 'You are a skilled writer who transforms conversations into authentic journal entries.'},
+            {'role': 'user', 'content': prompt}
+        ]
+    
+    def _journal_request(self):
+        """Messages for writing the entry: a polish pass if a draft is ready, else the full prompt"""
+        self.style_ready.wait(STYLE_WAIT)
+        if self.drafter is not None:
+            draft, remaining = self.drafter.finish()
+            if draft:
+                remaining = [msg for msg in remaining if not self._is_end_message(msg)]
+                return self._polish_messages(draft, remaining)
         
+        label, source = self._journal_source()
+        return self._journal_messages(source, label)
+    
+    def _journal_messages(self, conversation_content, label='Conversation'):
+        """Build the message list sent to Ollama to write the journal entry"""
         generation_prompt = f"""Based on this conversation, write a journal entry in the person's authentic voice.
 
 Style Instructions:
@@ -105,22 +394,49 @@ The journal entry should:
 - Include specific moments, feelings, and thoughts mentioned
 - Use the same casual, narrative flow they naturally use
 
-Conversation:
+{label}:
 {conversation_content}
 
 Write the journal entry now (just the content, no meta-commentary):"""
 
+        return [
+            {'role': 'system', 'content': 'You are a skilled writer who transforms conversations into authentic journal entries.'},
+            {'role': 'user', 'content': generation_prompt}
+        ]
+
+    def generate_journal_entry(self):
+        """Generate a journal entry from the conversation"""
+        conversation_content = self._conversation_content()
+
         try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {'role': 'system', 'content': 'You are a skilled writer who transforms conversations into authentic journal entries.'},
-                    {'role': 'user', 'content': generation_prompt}
-                ]
-            )
+            response = self.ollama_chat(self._journal_request(), priority=PRIORITY_GENERATION,
+                                        model=self.writer_model, task='entry')
             
             return response['message']['content']
             
         except Exception as e:
             # Fallback: just combine user messages
             return conversation_content
+
+    def generate_journal_entry_stream(self):
+        """Generate a journal entry from the conversation, yielding it in chunks"""
+        conversation_content = self._conversation_content()
+
+        generated = False
+        try:
+            stream = self.ollama_chat(self._journal_request(), stream=True, priority=PRIORITY_GENERATION,
+                                      model=self.writer_model, task='entry')
+
+            for part in stream:
+                chunk = part['message']['content']
+                if chunk:
+                    generated = True
+                    yield chunk
+
+        except Exception as e:
+            # Fallback: just combine user messages
+            if not generated:
+                yield conversation_content
+                return
+            yield INTERRUPTED_NOTE + conversation_content
+            raise EntryInterrupted(str(e)) from e
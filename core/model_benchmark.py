@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Measure how each installed Ollama model performs on this machine
+
+Run with: python -m core.model_benchmark [--force] [model ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+import ollama
+
+# A chat reply should be fully shown within this many seconds
+CHAT_LATENCY_TARGET = 2.0
+# Typical length of a 1-2 sentence chat reply, in tokens
+CHAT_REPLY_TOKENS = 40
+# Journal entries need at least this quality tier (see quality_tier)
+WRITER_MIN_TIER = 3
+# How often the memory sampler looks at the Ollama processes (seconds)
+SAMPLE_INTERVAL = 0.1
+
+CHAT_SYSTEM_PROMPT = """You are a friendly journaling companion. Have a natural, casual conversation to help the person journal about their day.
+Keep responses brief (1-2 sentences) and don't ask multiple questions at once."""
+
+CHAT_PROMPTS = [
+    "Pretty good day actually, I finally finished the project I've been stuck on for weeks.",
+    "I went for a run this morning and it was freezing but the sunrise was amazing.",
+    "Work was stressful, my manager moved the deadline up again and I stayed late.",
+]
+
+SAMPLE_CONVERSATION = """Pretty good day actually, I finally finished the project I've been stuck on for weeks.
+
+I went for a run this morning and it was freezing but the sunrise was amazing.
+
+Had lunch with Sam, we talked about maybe doing a trip in the spring.
+
+Evening was quiet, cooked pasta and watched half a movie before falling asleep."""
+
+ENTRY_PROMPT = f"""Based on this conversation, write a journal entry in the person's authentic voice, in first person.
+
+Conversation:
+{SAMPLE_CONVERSATION}
+
+Write the journal entry now (just the content, no meta-commentary):"""
+
+
+def quality_tier(parameter_size):
+    """Rough quality tier from a model's parameter count ('8.0B', '637M')
+
+    1: under 2B parameters, 2: under 6B, 3: 6B and up.
+    """
+    try:
+        value = float(parameter_size[:-1])
+        billions = value / 1000 if parameter_size[-1].upper() == 'M' else value
+    except (TypeError, ValueError, IndexError):
+        return 2
+    if billions < 2:
+        return 1
+    if billions < 6:
+        return 2
+    return 3
+
+
+def ollama_rss():
+    """Resident memory of all Ollama processes in bytes (Linux only, else None)"""
+    proc = Path('/proc')
+    if not proc.is_dir():
+        return None
+
+    total = 0
+    for entry in os.scandir(proc):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f'{entry.path}/comm') as f:
+                if not f.read().startswith('ollama'):
+                    continue
+            with open(f'{entry.path}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+class MemorySampler:
+    """Tracks peak Ollama memory on a background thread while a model runs"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            rss = ollama_rss()
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            if self._stop.wait(self.interval):
+                return
+
+
+class ModelBenchmark:
+    """Runs the fixed prompt set against installed models and caches the results
+
+    Results are stored per model in ~/.journal-buddy/benchmarks.json and
+    keyed by the model's digest, so a re-pulled model is measured again.
+    """
+
+    def __init__(self, client=None, cache_file=None):
+        if cache_file is None:
+            cache_file = Path.home() / '.journal-buddy' / 'benchmarks.json'
+        self.client = client or ollama.Client()
+        self.cache_file = Path(cache_file)
+        self.cache_file.parent.mkdir(exist_ok=True)
+        # Set by cancel(); checked between models and between streamed chunks
+        self.cancelled = threading.Event()
+        self.load()
+
+    def cancel(self):
+        """Stop a running benchmark soon (the model being measured is unloaded and not saved)"""
+        self.cancelled.set()
+
+    def load(self):
+        """Load cached results from disk"""
+        self.results = {}
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    self.results = json.load(f).get('models', {})
+            except (OSError, ValueError) as e:
+                print(f"Benchmark cache error: {e}")
+
+    def save(self):
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'models': self.results}, f, indent=2)
+        os.replace(tmp_file, self.cache_file)
+
+    def installed_models(self):
+        """Installed models as (name, digest, parameter_size) tuples"""
+        models = []
+        for model in self.client.list()['models']:
+            name = model.get('model') or model.get('name')
+            details = model.get('details') or {}
+            models.append((name, model.get('digest', ''), details.get('parameter_size')))
+        return models
+
+    def _stream(self, model, messages):
+        """Stream one reply; returns (time to first token, tokens/s, total seconds)"""
+        start = time.perf_counter()
+        first = None
+        chunks = 0
+        final = {}
+        for part in self.client.chat(model=model, messages=messages, stream=True):
+            if self.cancelled.is_set():
+                break
+            if part['message']['content']:
+                chunks += 1
+                if first is None:
+                    first = time.perf_counter() - start
+            if part.get('done'):
+                final = part
+        total = time.perf_counter() - start
+
+        # Prefer Ollama's own eval counters; chunk count is close enough without them
+        eval_count = final.get('eval_count') or chunks
+        eval_seconds = (final.get('eval_duration') or 0) / 1e9 or max(total - (first or 0), 1e-6)
+        return first or total, eval_count / eval_seconds, total
+
+    def run_model(self, model, parameter_size=None, digest=''):
+        """Benchmark one model from a cold start (None if cancelled)
+
+        The model is unloaded before and after, and peak_rss is measured
+        above the memory Ollama used before loading it, so models measured
+        earlier in the same run don't count towards it.
+        """
+        # Unload it first so the load time is real
+        self.client.generate(model=model, prompt='', keep_alive=0)
+        baseline = ollama_rss()
+
+        try:
+            with MemorySampler() as sampler:
+                start = time.perf_counter()
+                self.client.generate(model=model, prompt='', keep_alive='5m')
+                load_time = time.perf_counter() - start
+
+                ttfts, chat_rates = [], []
+                for prompt in CHAT_PROMPTS:
+                    ttft, rate, _ = self._stream(model, [
+                        {'role': 'system', 'content': CHAT_SYSTEM_PROMPT},
+                        {'role': 'user', 'content': prompt}
+                    ])
+                    ttfts.append(ttft)
+                    chat_rates.append(rate)
+
+                _, entry_rate, entry_time = self._stream(model, [{'role': 'user', 'content': ENTRY_PROMPT}])
+        finally:
+            # Free it before the next model is measured
+            self.client.generate(model=model, prompt='', keep_alive=0)
+
+        if self.cancelled.is_set():
+            return None
+        peak_rss = max(0, sampler.peak - (baseline or 0)) if sampler.peak is not None else None
+
+        ttft = statistics.median(ttfts)
+        chat_rate = statistics.median(chat_rates)
+        return {
+            'digest': digest,
+            'parameter_size': parameter_size,
+            'tier': quality_tier(parameter_size),
+            'load_time': round(load_time, 2),
+            'ttft': round(ttft, 3),
+            'chat_tokens_per_s': round(chat_rate, 1),
+            'chat_latency': round(ttft + CHAT_REPLY_TOKENS / max(chat_rate, 1e-6), 2),
+            'entry_tokens_per_s': round(entry_rate, 1),
+            'entry_time': round(entry_time, 1),
+            'peak_rss': peak_rss,
+            'measured': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def run(self, models=None, force=False, progress=None):
+        """Benchmark installed models (only new or changed ones unless force)"""
+        self.cancelled.clear()
+        for name, digest, parameter_size in self.installed_models():
+            if self.cancelled.is_set():
+                break
+            if models and name not in models and name.split(':')[0] not in models:
+                continue
+            cached = self.results.get(name)
+            if cached and cached.get('digest') == digest and not force:
+                continue
+
+            if progress:
+                progress(f'Benchmarking {name}...')
+            try:
+                result = self.run_model(name, parameter_size, digest)
+            except Exception as e:
+                print(f"Benchmark error for {name}: {e}")
+                continue
+            if result is None:
+                break
+            self.results[name] = result
+            # Keep finished models even if a later one fails
+            self.save()
+        return self.results
+
+    def recommend(self):
+        """Recommended models: {'chat': ..., 'writer': ..., 'overall': ...} (None if unknown)
+
+        chat: fastest model whose replies meet CHAT_LATENCY_TARGET.
+        writer: fastest model at WRITER_MIN_TIER or better.
+        overall: fastest model meeting both, for a single-model setup.
+        """
+        results = self.results
+        if not results:
+            return {'chat': None, 'writer': None, 'overall': None}
+
+        by_latency = sorted(results, key=lambda name: results[name]['chat_latency'])
+        by_entry = sorted(results, key=lambda name: results[name]['entry_time'])
+        fast = [name for name in by_latency if results[name]['chat_latency'] <= CHAT_LATENCY_TARGET]
+        good = [name for name in by_entry if results[name]['tier'] >= WRITER_MIN_TIER]
+
+        chat = fast[0] if fast else by_latency[0]
+        writer = good[0] if good else max(by_entry, key=lambda name: results[name]['tier'])
+        both = [name for name in fast if name in good]
+        return {'chat': chat, 'writer': writer, 'overall': both[0] if both else writer}
+
+
+def format_results(results):
+    """Plain-text table of benchmark results"""
+    lines = [f"{'Model':<24} {'Load':>6} {'TTFT':>6} {'Chat t/s':>9} {'Entry':>7} {'Peak RSS':>9}"]
+    for name, r in sorted(results.items(), key=lambda item: item[1]['chat_latency']):
+        rss = f"{r['peak_rss'] / 2**20:.0f} MB" if r.get('peak_rss') else '-'
+        lines.append(f"{name:<24} {r['load_time']:>5.1f}s {r['ttft']:>5.2f}s "
+                     f"{r['chat_tokens_per_s']:>9.1f} {r['entry_time']:>6.1f}s {rss:>9}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark installed Ollama models on this machine')
+    parser.add_argument('models', nargs='*', help='only these models (default: all installed)')
+    parser.add_argument('--force', action='store_true', help='re-run models that already have results')
+    args = parser.parse_args(argv)
+
+    benchmark = ModelBenchmark()
+    try:
+        results = benchmark.run(models=args.models, force=args.force, progress=print)
+    except Exception as e:
+        print(f"Could not reach Ollama: {e}")
+        return 1
+
+    print(format_results(results))
+    recommended = benchmark.recommend()
+    print(f"\nRecommended chat model:   {recommended['chat']}")
+    print(f"Recommended writer model: {recommended['writer']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
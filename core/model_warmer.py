@@ -0,0 +1,76 @@
+import re
+import threading
+import time
+
+# Don't send another load request if one went out this recently (seconds)
+WARM_COOLDOWN = 60
+# Units of an Ollama keep_alive duration such as '10m' or '1h30m'
+DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def keep_alive_seconds(keep_alive):
+    """How long Ollama keeps a model loaded for a keep_alive value (negative means forever)"""
+    if isinstance(keep_alive, (int, float)) or str(keep_alive).lstrip('-').isdigit():
+        seconds = float(keep_alive)
+    else:
+        keep_alive = str(keep_alive)
+        seconds = sum(float(value) * DURATION_UNITS[unit] for value, unit in DURATION_PART.findall(keep_alive))
+        if keep_alive.startswith('-'):
+            seconds = -1
+    return float('inf') if seconds < 0 else seconds
+
+
+class ModelWarmer:
+    """Loads the Ollama model into memory ahead of use
+
+    Loading a model from disk takes 5-20 s on CPU-only machines, so it is
+    loaded before the reminder fires or when the user reaches for the tray
+    menu. Ollama unloads it again once keep_alive passes without requests.
+    """
+
+    def __init__(self, model, keep_alive='10m'):
+        self.model = model
+        self.keep_alive = keep_alive
+        self._lock = threading.Lock()
+        self._last_warm = 0.0
+
+    def warm(self, keep_alive=None):
+        """Load the model in the background (no-op if that just happened)"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_warm < WARM_COOLDOWN:
+                return
+            self._last_warm = now
+
+        thread = threading.Thread(
+            target=self._load, args=(keep_alive or self.keep_alive,), daemon=True
+        )
+        thread.start()
+
+    def is_warm(self):
+        """Whether the model was loaded recently enough to still be in memory"""
+        with self._lock:
+            if not self._last_warm:
+                return False
+            return time.monotonic() - self._last_warm < keep_alive_seconds(self.keep_alive)
+
+    def _load(self, keep_alive):
+        try:
+            import ollama
+            # An empty prompt just loads the model
+            ollama.generate(model=self.model, prompt='', keep_alive=keep_alive)
+        except Exception as e:
+            print(f"Model pre-warm error: {e}")
+            with self._lock:
+                self._last_warm = 0.0
+
+    def unload(self):
+        """Ask Ollama to free the model's memory now"""
+        with self._lock:
+            self._last_warm = 0.0
+        try:
+            import ollama
+            ollama.generate(model=self.model, prompt='', keep_alive=0)
+        except Exception as e:
+            print(f"Model unload error: {e}")
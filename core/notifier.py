@@ -0,0 +1,47 @@
+import queue
+import threading
+
+
+class Notifier:
+    """Shows desktop notifications from a worker thread of its own
+
+    plyer's notify() can block for seconds (or until timeout) on a slow or
+    missing notification daemon, so callers only queue the notification
+    and carry on. plyer is imported on first use.
+    """
+
+    def __init__(self, app_name='Journal Buddy'):
+        self.app_name = app_name
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def notify(self, title, message, timeout=10):
+        """Queue a notification (returns immediately)"""
+        self._queue.put((title, message, timeout))
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            title, message, timeout = self._queue.get()
+            try:
+                from plyer import notification
+                notification.notify(title=title, message=message, app_name=self.app_name, timeout=timeout)
+            except Exception as e:
+                print(f"Notification error: {e}")
+
+
+_notifier = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier():
+    """The process-wide notifier"""
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None:
+            _notifier = Notifier()
+        return _notifier
@@ -1,12 +1,23 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime, time as datetime_time
-from plyer import notification
+from core.notifier import get_notifier
 
 class NotificationScheduler:
-    def __init__(self, callback):
+    """Daily reminder and model pre-warm jobs
+    
+    Jobs run on APScheduler's worker thread, so the callbacks must only
+    hand work off (e.g. post to the GUI's event bus) and return. The
+    notification itself is shown by the notifier's own thread.
+    """
+    
+    def __init__(self, callback, prewarm_callback=None, prewarm_minutes=5, notifier=None):
         self.scheduler = BackgroundScheduler()
         self.callback = callback
+        self.notifier = notifier or get_notifier()
         self.notification_time = "21:00"  # Default 9 PM
+        # Called this many minutes before the reminder (e.g. to load the model)
+        self.prewarm_callback = prewarm_callback
+        self.prewarm_minutes = prewarm_minutes
     
     def set_notification_time(self, time_str):
         """Set the daily notification time (format: HH:MM)"""
@@ -16,7 +27,11 @@ class NotificationScheduler:
     def start(self, notification_time="21:00"):
         """Start the scheduler with daily notifications"""
         self.notification_time = notification_time
-        
+        self._add_jobs()
+        self.scheduler.start()
+    
+    def _add_jobs(self):
+        """Schedule the daily notification and the pre-warm job before it"""
         # Parse time
         hour, minute = map(int, self.notification_time.split(':'))
         
@@ -29,19 +44,31 @@ class NotificationScheduler:
             id='daily_journal_reminder'
         )
         
-        self.scheduler.start()
+        if self.prewarm_callback is not None and self.prewarm_minutes > 0:
+            # Wraps around midnight, e.g. 00:02 - 5 min -> 23:57
+            total = (hour * 60 + minute - self.prewarm_minutes) % (24 * 60)
+            self.scheduler.add_job(
+                self._prewarm,
+                'cron',
+                hour=total // 60,
+                minute=total % 60,
+                id='model_prewarm'
+            )
+    
+    def _prewarm(self):
+        """Run the pre-warm callback"""
+        try:
+            self.prewarm_callback()
+        except Exception as e:
+            print(f"Pre-warm error: {e}")
     
     def _send_notification(self):
         """Send notification and trigger callback"""
         try:
-            notification.notify(
-                title='Journal Time! 📝',
-                message='Time to reflect on your day',
-                app_name='Journal Buddy',
-                timeout=10
-            )
+            # Queued, so a slow notification daemon can't hold up the reminder
+            self.notifier.notify('Journal Time! 📝', 'Time to reflect on your day')
             
-            # Call the callback (opens the chat window)
+            # Call the callback (the app opens the chat window on its GUI thread)
             self.callback()
             
         except Exception as e:
@@ -50,15 +77,8 @@ class NotificationScheduler:
     def reschedule(self):
         """Reschedule the notification with new time"""
         if self.scheduler.running:
-            self.scheduler.remove_job('daily_journal_reminder')
-            hour, minute = map(int, self.notification_time.split(':'))
-            self.scheduler.add_job(
-                self._send_notification,
-                'cron',
-                hour=hour,
-                minute=minute,
-                id='daily_journal_reminder'
-            )
+            self.scheduler.remove_all_jobs()
+            self._add_jobs()
     
     def stop(self):
         """Stop the scheduler"""
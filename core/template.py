@@ -0,0 +1,69 @@
+from datetime import datetime
+from pathlib import Path
+import math
+import os
+import re
+
+# {{name}}, as in Obsidian template notes (single braces are left alone: notes use them freely)
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# Reference new moon (2000-01-06 18:14 UTC) and mean lunar month in days
+KNOWN_NEW_MOON = datetime(2000, 1, 6, 18, 14)
+SYNODIC_MONTH = 29.530588853
+MOON_PHASES = [
+    '🌑 New Moon', '🌒 Waxing Crescent', '🌓 First Quarter', '🌔 Waxing Gibbous',
+    '🌕 Full Moon', '🌖 Waning Gibbous', '🌗 Last Quarter', '🌘 Waning Crescent'
+]
+
+# path -> (mtime_ns, CompiledTemplate), shared by every JournalWriter
+_template_cache = {}
+
+
+class CompiledTemplate:
+    """A template parsed once into literal and placeholder segments"""
+
+    def __init__(self, text):
+        self.segments = []
+        self.slots = []  # (segment index, placeholder name)
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            if match.start() > position:
+                self.segments.append(text[position:match.start()])
+            self.slots.append((len(self.segments), match.group(1)))
+            # Unknown placeholders render as their original text
+            self.segments.append(match.group(0))
+            position = match.end()
+        if position < len(text):
+            self.segments.append(text[position:])
+
+        self.names = {name for index, name in self.slots}
+
+    def render(self, values):
+        """Fill in the placeholders with a single join"""
+        parts = list(self.segments)
+        for index, name in self.slots:
+            if name in values:
+                parts[index] = values[name]
+        return ''.join(parts)
+
+
+def load_template(path):
+    """Compile a template note, reusing the compiled version until its mtime changes"""
+    path = Path(path)
+    mtime = os.stat(path).st_mtime_ns
+
+    cached = _template_cache.get(str(path))
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        template = CompiledTemplate(f.read())
+    _template_cache[str(path)] = (mtime, template)
+    return template
+
+
+def moon_phase(date):
+    """Name of the moon phase on a date"""
+    days = (datetime(date.year, date.month, date.day, 12) - KNOWN_NEW_MOON).total_seconds() / 86400
+    age = (days % SYNODIC_MONTH) / SYNODIC_MONTH
+    return MOON_PHASES[math.floor(age * 8 + 0.5) % 8]
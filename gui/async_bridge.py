@@ -0,0 +1,55 @@
+import asyncio
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class BridgeTask(QObject):
+    """A stream running on the bridge; its items arrive as Qt signals"""
+    chunk_ready = pyqtSignal(object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.future = None
+
+    def cancel(self):
+        """Cancel the coroutine (an open Ollama stream is closed with it)"""
+        if self.future is not None:
+            self.future.cancel()
+
+
+class AsyncBridge:
+    """Runs coroutines on one asyncio loop alongside the Qt event loop
+
+    The loop lives on a single companion thread for the whole session and
+    results are handed back through queued Qt signals, so slots always run
+    on the GUI thread.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def stream(self, agen):
+        """Iterate an async generator; emits chunk_ready(item) for each, then finished(None)"""
+        task = BridgeTask()
+
+        async def runner():
+            try:
+                async for item in agen:
+                    task.chunk_ready.emit(item)
+            except Exception as e:
+                task.failed.emit(str(e))
+                return
+            finally:
+                await agen.aclose()
+            task.finished.emit(None)
+
+        task.future = asyncio.run_coroutine_threadsafe(runner(), self.loop)
+        return task
+
+    def stop(self):
+        """Stop the loop (pending coroutines are dropped)"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
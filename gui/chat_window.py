@@ -2,44 +2,219 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QTextEdit, QLineEdit, QPushButton, QLabel, QScrollArea)
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QFont, QTextCursor
+import queue
 import sys
+import time
+from core.journal_writer import write_draft, close_draft
+
+# Stream chunks are batched so the display repaints at most this often (~60 fps)
+FRAME_INTERVAL = 1 / 60
+
+
+class ChunkBatcher:
+    """Collects streamed chunks and releases them at most once per frame"""
+    
+    def __init__(self, interval=FRAME_INTERVAL):
+        self.interval = interval
+        self.pending = []
+        self.last_emit = 0.0
+    
+    def add(self, chunk):
+        """Add a chunk; returns the batched text when a frame is due, else None"""
+        self.pending.append(chunk)
+        
+        # The first chunk goes out immediately
+        now = time.monotonic()
+        if now - self.last_emit >= self.interval:
+            self.last_emit = now
+            return self.flush()
+        return None
+    
+    def flush(self):
+        """Return everything still pending"""
+        text = ''.join(self.pending)
+        self.pending = []
+        return text
+
+
+async def batch_stream(agen):
+    """Async counterpart of the workers' batching: yields (text, is_done) once per frame"""
+    batcher = ChunkBatcher()
+    is_done = False
+    try:
+        async for chunk, is_done in agen:
+            text = batcher.add(chunk)
+            if text:
+                yield text, is_done
+    except Exception:
+        # Hand on what arrived before the error, then the error itself
+        text = batcher.flush()
+        if text:
+            yield text, is_done
+        raise
+    
+    # Always yield a last item so the caller learns is_done
+    yield batcher.flush(), is_done
+
+
+async def draft_stream(agen, draft):
+    """Stream journal chunks into a sidecar draft as they arrive"""
+    try:
+        async for chunk in agen:
+            write_draft(draft, chunk)
+            yield chunk, False
+    finally:
+        close_draft(draft)
+
 
 class ChatWorker(QThread):
-    """Worker thread for LLM operations to prevent UI freezing"""
+    """Long-lived worker thread that sends the user's messages to the LLM
+
+    One worker serves the whole conversation; messages are queued with
+    send() and stop() abandons the reply in progress.
+    """
     response_ready = pyqtSignal(str, bool)
+    chunk_ready = pyqtSignal(str)
     
-    def __init__(self, llm_handler, message):
+    def __init__(self, llm_handler, stream=True):
         super().__init__()
         self.llm_handler = llm_handler
-        self.message = message
+        self.stream = stream
+        self.messages = queue.Queue()
+        self.stopping = False
+    
+    def send(self, message):
+        """Queue a message to be answered"""
+        self.messages.put(message)
+    
+    def stop(self):
+        """Cancel the current reply and end the thread"""
+        self.stopping = True
+        self.messages.put(None)
+        self.llm_handler.cancel_chat()
     
     def run(self):
-        response, is_done = self.llm_handler.chat(self.message)
-        self.response_ready.emit(response, is_done)
+        while True:
+            message = self.messages.get()
+            if message is None or self.stopping:
+                return
+            self.reply(message)
+    
+    def reply(self, message):
+        if not self.stream:
+            response, is_done = self.llm_handler.chat(message)
+            self.response_ready.emit(response, is_done)
+            return
+        
+        parts = []
+        is_done = False
+        batcher = ChunkBatcher()
+        
+        for chunk, is_done in self.llm_handler.chat_stream(message):
+            if self.stopping:
+                return
+            parts.append(chunk)
+            text = batcher.add(chunk)
+            if text:
+                self.chunk_ready.emit(text)
+        
+        text = batcher.flush()
+        if text:
+            self.chunk_ready.emit(text)
+        
+        self.response_ready.emit(''.join(parts), is_done)
 
 
 class JournalGeneratorWorker(QThread):
     """Worker thread for generating journal entry"""
     entry_ready = pyqtSignal(str)
+    # The entry broke off: (error, partial entry followed by the user's messages)
+    entry_interrupted = pyqtSignal(str, str)
+    chunk_ready = pyqtSignal(str)
     
-    def __init__(self, llm_handler):
+    def __init__(self, llm_handler, journal_writer=None):
         super().__init__()
         self.llm_handler = llm_handler
+        self.journal_writer = journal_writer
+        self.draft = None
     
     def run(self):
-        entry = self.llm_handler.generate_journal_entry()
-        self.entry_ready.emit(entry)
+        if self.journal_writer is None:
+            entry = self.llm_handler.generate_journal_entry()
+            self.entry_ready.emit(entry)
+            return
+        
+        # Stream into a sidecar draft so a crash mid-generation loses nothing
+        try:
+            self.draft = self.journal_writer.start_draft()
+        except Exception as e:
+            print(f"Draft error, continuing without it: {e}")
+        parts = []
+        batcher = ChunkBatcher()
+        
+        # entry_ready or entry_interrupted always goes out, so the window never hangs on "generating"
+        error = None
+        try:
+            for chunk in self.llm_handler.generate_journal_entry_stream():
+                parts.append(chunk)
+                write_draft(self.draft, chunk)
+                text = batcher.add(chunk)
+                if text:
+                    self.chunk_ready.emit(text)
+        except Exception as e:
+            print(f"Journal generation error: {e}")
+            error = str(e)
+        finally:
+            close_draft(self.draft)
+        
+        text = batcher.flush()
+        if text:
+            self.chunk_ready.emit(text)
+        
+        if error is not None:
+            self.entry_interrupted.emit(error, ''.join(parts))
+        else:
+            self.entry_ready.emit(''.join(parts))
 
 
 class ChatWindow(QMainWindow):
-    def __init__(self, llm_handler, journal_writer):
+    connection_changed = pyqtSignal(object)
+    # The journal entry was saved (or kept as a draft); the window may be let go of now
+    entry_finished = pyqtSignal()
+    
+    def __init__(self, llm_handler, journal_writer, bridge=None, health=None):
         super().__init__()
         self.llm_handler = llm_handler
         self.journal_writer = journal_writer
+        # Optional HealthMonitor: the window opens at once and shows the connection state
+        self.health = health
+        self.connected = health is None
+        self.connection_message = ''
+        # With an AsyncBridge (and AsyncLLMHandler), LLM calls run as coroutines instead of QThreads
+        self.bridge = bridge
         self.conversation_ended = False
+        self.streaming_reply = False
+        self.reply_task = None
+        self.entry_task = None
+        self.entry_draft = None
+        self.generator = None
+        self.writing_entry = False
+        
+        self.worker = None
+        if self.bridge is None:
+            self.worker = ChatWorker(self.llm_handler)
+            self.worker.chunk_ready.connect(self.handle_chunk)
+            self.worker.response_ready.connect(self.handle_response)
+            self.worker.start()
         
         self.init_ui()
         self.start_conversation()
+        
+        if self.health is not None:
+            # Listeners run on the monitor thread; the signal brings the status to the GUI thread
+            self.connection_changed.connect(self.set_connection_state)
+            self.health_listener = self.connection_changed.emit
+            self.health.add_listener(self.health_listener)
     
     def init_ui(self):
         """Initialize the user interface"""
@@ -138,6 +313,21 @@ class ChatWindow(QMainWindow):
         self.add_message('Assistant', greeting)
         self.message_input.setFocus()
     
+    def set_connection_state(self, status):
+        """Show whether Ollama is reachable yet"""
+        self.connected = bool(status.reachable)
+        if self.connected and not status.has_model(self.llm_handler.model):
+            message = f'Model {self.llm_handler.model} is not installed (run: ollama pull {self.llm_handler.model})'
+        elif self.connected:
+            message = ''
+        else:
+            message = status.describe()
+        
+        # Don't overwrite progress messages like 'Thinking...'
+        if self.status_label.text() in ('', self.connection_message):
+            self.status_label.setText(message)
+        self.connection_message = message
+    
     def add_message(self, sender, message):
         """Add a message to the chat display"""
         if sender == 'Assistant':
@@ -161,6 +351,11 @@ class ChatWindow(QMainWindow):
         if not message:
             return
         
+        if not self.connected:
+            self.status_label.setText(self.connection_message or 'Connecting to Ollama...')
+            self.health.check_now()
+            return
+        
         # Add user message to display
         self.add_message('You', message)
         self.message_input.clear()
@@ -170,14 +365,54 @@ class ChatWindow(QMainWindow):
         self.send_button.setEnabled(False)
         self.status_label.setText('Thinking...')
         
+        self.streaming_reply = False
+        if self.bridge is not None:
+            self.start_async_reply(message)
+            return
+        
         # Process in background thread
-        self.worker = ChatWorker(self.llm_handler, message)
-        self.worker.response_ready.connect(self.handle_response)
-        self.worker.start()
+        self.worker.send(message)
+    
+    def start_async_reply(self, message):
+        """Stream the reply on the asyncio bridge"""
+        self.reply_parts = []
+        self.reply_done = False
+        self.reply_task = self.bridge.stream(batch_stream(self.llm_handler.chat_stream(message)))
+        self.reply_task.chunk_ready.connect(self.handle_async_chunk)
+        self.reply_task.finished.connect(
+            lambda _: self.handle_response(''.join(self.reply_parts), self.reply_done))
+        self.reply_task.failed.connect(
+            lambda error: self.handle_response(f"Sorry, something went wrong: {error}", False))
+    
+    def handle_async_chunk(self, item):
+        """Collect a batched (text, is_done) item from the bridge"""
+        text, self.reply_done = item
+        if text:
+            self.reply_parts.append(text)
+            self.handle_chunk(text)
+    
+    def append_stream_text(self, text):
+        """Append streamed text to the end of the last message"""
+        cursor = self.chat_display.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        self.chat_display.setTextCursor(cursor)
+    
+    def handle_chunk(self, chunk):
+        """Render part of a streamed reply as it arrives"""
+        if not self.streaming_reply:
+            # First tokens: open a new assistant message to stream into
+            self.streaming_reply = True
+            self.add_message('Assistant', '')
+            self.status_label.setText('')
+        
+        self.append_stream_text(chunk)
     
     def handle_response(self, response, is_done):
         """Handle the LLM response"""
-        self.add_message('Assistant', response)
+        if not self.streaming_reply:
+            self.add_message('Assistant', response)
+        self.streaming_reply = False
         
         # Re-enable input
         self.message_input.setEnabled(True)
@@ -195,15 +430,92 @@ class ChatWindow(QMainWindow):
         self.message_input.setEnabled(False)
         self.send_button.setEnabled(False)
         
+        self.streaming_reply = False
+        self.writing_entry = True
+        if self.bridge is not None:
+            self.start_async_entry()
+            return
+        
         # Generate in background thread
-        self.generator = JournalGeneratorWorker(self.llm_handler)
+        self.generator = JournalGeneratorWorker(self.llm_handler, self.journal_writer)
+        self.generator.chunk_ready.connect(self.handle_entry_chunk)
         self.generator.entry_ready.connect(self.save_journal_entry)
+        self.generator.entry_interrupted.connect(self.keep_interrupted_entry)
+        # Slots run in connection order, so this comes after the entry is saved
+        self.generator.finished.connect(self.finish_entry)
         self.generator.start()
     
+    def start_async_entry(self):
+        """Stream the journal entry on the asyncio bridge, into a sidecar draft"""
+        self.entry_draft = self.journal_writer.start_draft()
+        self.entry_parts = []
+        stream = draft_stream(self.llm_handler.generate_journal_entry_stream(), self.entry_draft)
+        self.entry_task = self.bridge.stream(batch_stream(stream))
+        self.entry_task.chunk_ready.connect(self.handle_async_entry_chunk)
+        self.entry_task.finished.connect(lambda _: self.save_journal_entry(''.join(self.entry_parts)))
+        self.entry_task.failed.connect(lambda error: self.keep_interrupted_entry(error, ''.join(self.entry_parts)))
+        self.entry_task.finished.connect(lambda _: self.finish_entry())
+        self.entry_task.failed.connect(lambda error: self.finish_entry())
+    
+    def finish_entry(self):
+        """The entry has been dealt with: nothing in this window is running any more"""
+        self.writing_entry = False
+        self.entry_finished.emit()
+    
+    def handle_async_entry_chunk(self, item):
+        """Collect a batched piece of the journal entry from the bridge"""
+        text, _ = item
+        if text:
+            self.entry_parts.append(text)
+            self.handle_entry_chunk(text)
+    
+    def handle_entry_chunk(self, chunk):
+        """Show the journal entry live while it is being written"""
+        if not self.streaming_reply:
+            self.streaming_reply = True
+            self.add_message('Assistant', '<i>Your journal entry:</i><br/>')
+        
+        self.append_stream_text(chunk)
+    
+    def keep_interrupted_entry(self, error, entry):
+        """The entry broke off: keep it as a draft instead of saving it as finished
+        
+        The draft holds the partial entry followed by the user's messages and
+        is saved into the note the next time the app starts.
+        """
+        self.streaming_reply = False
+        draft = self.entry_draft if self.bridge is not None else self.generator.draft
+        try:
+            if draft is not None and not draft.abandoned and draft.path.exists():
+                kept = f'kept in {draft.path.name} and added to your note the next time Journal Buddy starts'
+            elif entry.strip():
+                # There is no draft to keep it in, so save it as it is (it says where it was cut off)
+                kept = f'saved to {self.journal_writer.create_journal_entry(entry).name}'
+            else:
+                kept = 'lost'
+        except Exception as e:
+            self.status_label.setText(f'❌ Error saving journal: {str(e)}')
+            return
+        
+        self.status_label.setText('⚠️ The journal entry was cut off')
+        self.add_message('System', f'<b>The journal entry was cut off:</b> {error}<br/>'
+                                   f'What was written so far, and what you said, is {kept}.')
+    
     def save_journal_entry(self, entry):
         """Save the generated journal entry"""
+        self.streaming_reply = False
         try:
-            filepath = self.journal_writer.create_journal_entry(entry)
+            draft = self.entry_draft if self.bridge is not None else self.generator.draft
+            if draft is not None and not draft.abandoned:
+                filepath = self.journal_writer.commit_draft(draft)
+            elif entry.strip():
+                filepath = self.journal_writer.create_journal_entry(entry)
+            else:
+                filepath = None
+            
+            if filepath is None:
+                raise ValueError('The generated entry was empty')
+            
             self.status_label.setText(f'✅ Journal saved to: {filepath.name}')
             self.add_message('System', f'<b>Journal entry created successfully!</b><br/>Saved to: {filepath}')
             
@@ -231,3 +543,14 @@ class ChatWindow(QMainWindow):
             self.status_label.setText(f'❌ Error saving journal: {str(e)}')
             self.message_input.setEnabled(True)
             self.send_button.setEnabled(True)
+    
+    def closeEvent(self, event):
+        """Abandon any reply still being generated"""
+        if self.health is not None:
+            self.health.remove_listener(self.health_listener)
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker.wait(2000)
+        if self.reply_task is not None:
+            self.reply_task.cancel()
+        super().closeEvent(event)
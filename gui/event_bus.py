@@ -0,0 +1,45 @@
+import queue
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+
+class EventBus(QObject):
+    """Carries events from any thread to handlers on the GUI thread
+
+    post() only queues the event and emits a signal, so it is safe and
+    cheap to call from scheduler jobs or monitor threads. The signal is
+    delivered through Qt's event loop, which drains the queue and calls
+    the handlers subscribed to each event on the GUI thread.
+    """
+    posted = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self._queue = queue.SimpleQueue()
+        self._handlers = {}  # event name -> list of handlers
+        self.posted.connect(self._drain, Qt.ConnectionType.QueuedConnection)
+
+    def subscribe(self, name, handler):
+        """Call handler(*args) on the GUI thread whenever `name` is posted (GUI thread only)"""
+        self._handlers.setdefault(name, []).append(handler)
+
+    def unsubscribe(self, name, handler):
+        if handler in self._handlers.get(name, []):
+            self._handlers[name].remove(handler)
+
+    def post(self, name, *args):
+        """Queue an event for the GUI thread (any thread, returns immediately)"""
+        self._queue.put((name, args))
+        self.posted.emit()
+
+    def _drain(self):
+        # One signal may find several events queued; later signals then find none
+        while True:
+            try:
+                name, args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            for handler in list(self._handlers.get(name, [])):
+                try:
+                    handler(*args)
+                except Exception as e:
+                    print(f"Event handler error ({name}): {e}")
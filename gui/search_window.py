@@ -0,0 +1,93 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QListWidget, QListWidgetItem
+from PyQt6.QtCore import Qt, QUrl
+from PyQt6.QtGui import QFont, QDesktopServices
+from urllib.parse import quote
+
+# Results shown per search
+RESULT_LIMIT = 50
+
+
+class SearchWindow(QWidget):
+    """Search box over past journal entries, results update as you type
+
+    Queries go to the SearchIndex, so they take milliseconds and can run
+    on every keystroke. Double-clicking a result opens its note in Obsidian.
+    """
+
+    def __init__(self, search_index):
+        super().__init__()
+        self.search_index = search_index
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle('Search - Journal Buddy')
+        self.setGeometry(200, 200, 560, 480)
+
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        title = QLabel('🔍 Search Journal')
+        title_font = QFont()
+        title_font.setPointSize(16)
+        title_font.setBold(True)
+        title.setFont(title_font)
+        layout.addWidget(title)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('Words from past entries...')
+        self.search_input.setStyleSheet("""
+            QLineEdit {
+                padding: 8px;
+                border: 2px solid #ddd;
+                border-radius: 5px;
+                font-size: 13px;
+            }
+        """)
+        self.search_input.textChanged.connect(self.run_search)
+        layout.addWidget(self.search_input)
+
+        self.status_label = QLabel('')
+        self.status_label.setStyleSheet('color: #666; font-size: 11px;')
+        layout.addWidget(self.status_label)
+
+        self.results = QListWidget()
+        self.results.setWordWrap(True)
+        self.results.setStyleSheet('font-size: 12px;')
+        self.results.itemActivated.connect(self.open_result)
+        layout.addWidget(self.results)
+
+        self.setLayout(layout)
+
+    def run_search(self, text):
+        """Show the entries matching what's typed so far"""
+        self.results.clear()
+        if not text.strip():
+            self.status_label.setText('')
+            return
+
+        try:
+            hits = self.search_index.search(text, limit=RESULT_LIMIT)
+        except Exception as e:
+            self.status_label.setText(f'Search error: {e}')
+            return
+
+        for hit in hits:
+            heading = f'{hit.day} {hit.time}'.strip()
+            item = QListWidgetItem(f'{heading}\n{hit.snippet}')
+            item.setData(Qt.ItemDataRole.UserRole, str(hit.path))
+            self.results.addItem(item)
+
+        count = len(hits)
+        more = '+' if count == RESULT_LIMIT else ''
+        self.status_label.setText(f'{count}{more} entries' if count else 'No entries found')
+
+    def open_result(self, item):
+        """Open the result's daily note in Obsidian"""
+        path = item.data(Qt.ItemDataRole.UserRole)
+        QDesktopServices.openUrl(QUrl(f'obsidian://open?path={quote(path)}'))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.search_input.setFocus()
+        self.search_input.selectAll()
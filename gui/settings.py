@@ -1,8 +1,29 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QPushButton, QLineEdit, QFileDialog, QTimeEdit, QMessageBox)
-from PyQt6.QtCore import Qt, QTime
+                             QPushButton, QLineEdit, QFileDialog, QTimeEdit, QMessageBox,
+                             QCheckBox)
+from PyQt6.QtCore import Qt, QTime, QThread, pyqtSignal
 from PyQt6.QtGui import QFont
 from pathlib import Path
+from core.model_benchmark import ModelBenchmark, format_results
+
+
+class BenchmarkWorker(QThread):
+    """Runs the model benchmark off the GUI thread"""
+    progress = pyqtSignal(str)
+    finished_results = pyqtSignal(str)
+    
+    def __init__(self, benchmark):
+        super().__init__()
+        self.benchmark = benchmark
+    
+    def run(self):
+        try:
+            self.benchmark.run(progress=self.progress.emit)
+        except Exception as e:
+            self.finished_results.emit(f'Benchmark failed: {e}')
+            return
+        self.finished_results.emit('')
+
 
 class SettingsDialog(QDialog):
     def __init__(self, config, parent=None):
@@ -13,7 +34,7 @@ class SettingsDialog(QDialog):
     def init_ui(self):
         """Initialize the settings UI"""
         self.setWindowTitle('Settings - Journal Buddy')
-        self.setGeometry(200, 200, 500, 300)
+        self.setGeometry(200, 200, 560, 640)
         
         layout = QVBoxLayout()
         layout.setSpacing(20)
@@ -64,6 +85,24 @@ class SettingsDialog(QDialog):
         
         layout.addLayout(vault_layout)
         
+        # Template note
+        template_label = QLabel('Daily Note Template (optional):')
+        template_label.setStyleSheet('font-weight: bold; font-size: 13px;')
+        layout.addWidget(template_label)
+        
+        self.template_input = QLineEdit()
+        self.template_input.setText(self.config.get('template_path', ''))
+        self.template_input.setPlaceholderText('Templates/Daily Note.md (relative to the vault)')
+        self.template_input.setStyleSheet("""
+            QLineEdit {
+                padding: 8px;
+                font-size: 13px;
+                border: 1px solid #ddd;
+                border-radius: 5px;
+            }
+        """)
+        layout.addWidget(self.template_input)
+        
         # Notification time
         time_label = QLabel('Daily Notification Time:')
         time_label.setStyleSheet('font-weight: bold; font-size: 13px;')
@@ -84,8 +123,8 @@ class SettingsDialog(QDialog):
         """)
         layout.addWidget(self.time_edit)
         
-        # Ollama model
-        model_label = QLabel('Ollama Model:')
+        # Ollama models
+        model_label = QLabel('Chat Model (quick follow-up questions):')
         model_label.setStyleSheet('font-weight: bold; font-size: 13px;')
         layout.addWidget(model_label)
         
@@ -102,6 +141,49 @@ class SettingsDialog(QDialog):
         """)
         layout.addWidget(self.model_input)
         
+        writer_label = QLabel('Writer Model (the journal entry, optional):')
+        writer_label.setStyleSheet('font-weight: bold; font-size: 13px;')
+        layout.addWidget(writer_label)
+        
+        self.writer_input = QLineEdit()
+        self.writer_input.setText(self.config.get('writer_model', ''))
+        self.writer_input.setPlaceholderText('Same as the chat model (e.g. llama3.1 with a small chat model)')
+        self.writer_input.setStyleSheet("""
+            QLineEdit {
+                padding: 8px;
+                font-size: 13px;
+                border: 1px solid #ddd;
+                border-radius: 5px;
+            }
+        """)
+        layout.addWidget(self.writer_input)
+        
+        # Model benchmark (results are cached, so this shows the last run right away)
+        self.benchmark = None
+        self.benchmark_worker = None
+        self.benchmark_label = QLabel('')
+        self.benchmark_label.setStyleSheet('font-family: monospace; font-size: 11px; color: #444;')
+        self.benchmark_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.benchmark_label)
+        
+        benchmark_layout = QHBoxLayout()
+        self.benchmark_button = QPushButton('Benchmark models')
+        self.benchmark_button.clicked.connect(self.run_benchmark)
+        benchmark_layout.addWidget(self.benchmark_button)
+        
+        self.recommend_button = QPushButton('Use recommended')
+        self.recommend_button.clicked.connect(self.use_recommended)
+        self.recommend_button.setEnabled(False)
+        benchmark_layout.addWidget(self.recommend_button)
+        layout.addLayout(benchmark_layout)
+        self.show_benchmark_results()
+        
+        # Speculative drafting
+        self.drafting_checkbox = QCheckBox('Draft the entry in the background while chatting')
+        self.drafting_checkbox.setChecked(self.config.get('speculative_drafting', False))
+        self.drafting_checkbox.setStyleSheet('font-size: 13px;')
+        layout.addWidget(self.drafting_checkbox)
+        
         # Info text
         info = QLabel('ℹ️ Make sure Ollama is installed and running')
         info.setStyleSheet('color: #666; font-size: 12px; font-style: italic;')
@@ -152,6 +234,61 @@ class SettingsDialog(QDialog):
         
         self.setLayout(layout)
     
+    def show_benchmark_results(self, message=''):
+        """Show cached benchmark results and the recommendation"""
+        try:
+            if self.benchmark is None:
+                self.benchmark = ModelBenchmark()
+            else:
+                self.benchmark.load()
+        except Exception as e:
+            self.benchmark_label.setText(f'Benchmark unavailable: {e}')
+            return
+        
+        results = self.benchmark.results
+        if not results:
+            self.benchmark_label.setText(message or 'Run a benchmark to see which models are fast on this machine.')
+            return
+        
+        recommended = self.benchmark.recommend()
+        text = format_results(results)
+        text += f"\nRecommended: {recommended['overall']} (chat: {recommended['chat']}, writer: {recommended['writer']})"
+        if message:
+            text = f'{message}\n{text}'
+        self.benchmark_label.setText(text)
+        self.recommend_button.setEnabled(True)
+    
+    def run_benchmark(self):
+        """Benchmark installed models in the background"""
+        if self.benchmark is None:
+            return
+        self.benchmark_button.setEnabled(False)
+        self.benchmark_label.setText('Starting benchmark (this can take a few minutes)...')
+        self.benchmark_worker = BenchmarkWorker(self.benchmark)
+        self.benchmark_worker.progress.connect(self.benchmark_label.setText)
+        self.benchmark_worker.finished_results.connect(self.benchmark_finished)
+        self.benchmark_worker.start()
+    
+    def done(self, result):
+        """Stop a running benchmark before the dialog goes away"""
+        if self.benchmark_worker is not None and self.benchmark_worker.isRunning():
+            self.benchmark.cancel()
+            self.benchmark_worker.wait()
+        super().done(result)
+    
+    def benchmark_finished(self, message):
+        self.benchmark_button.setEnabled(True)
+        self.show_benchmark_results(message)
+    
+    def use_recommended(self):
+        """Fill in the recommended chat and writer models"""
+        recommended = self.benchmark.recommend()
+        if recommended['chat']:
+            self.model_input.setText(recommended['chat'])
+        if recommended['writer']:
+            writer = recommended['writer'] if recommended['writer'] != recommended['chat'] else ''
+            self.writer_input.setText(writer)
+    
     def browse_vault(self):
         """Open file dialog to select vault directory"""
         try:
@@ -181,17 +318,26 @@ class SettingsDialog(QDialog):
                 QMessageBox.warning(self, 'Error', 'The vault path does not exist')
                 return
             
-            # Save configuration
-            self.config.set_vault_path(vault_path)
-            
-            time = self.time_edit.time()
-            time_str = f"{time.hour():02d}:{time.minute():02d}"
-            self.config.set_notification_time(time_str)
-            
-            model = self.model_input.text().strip() or 'tinyllama'
-            self.config.set('ollama_model', model)
+            template_path = self.template_input.text().strip()
+            if template_path and not (Path(vault_path) / template_path).exists():
+                QMessageBox.warning(self, 'Error', 'The template note does not exist')
+                return
             
-            self.config.set('first_run', False)
+            # Save configuration (one write for all settings)
+            with self.config.batch():
+                self.config.set_vault_path(vault_path)
+                self.config.set('template_path', template_path)
+                
+                time = self.time_edit.time()
+                time_str = f"{time.hour():02d}:{time.minute():02d}"
+                self.config.set_notification_time(time_str)
+                
+                model = self.model_input.text().strip() or 'tinyllama'
+                self.config.set('ollama_model', model)
+                self.config.set('writer_model', self.writer_input.text().strip())
+                self.config.set('speculative_drafting', self.drafting_checkbox.isChecked())
+                
+                self.config.set('first_run', False)
             
             QMessageBox.information(self, 'Success', 'Settings saved successfully!')
             self.accept()
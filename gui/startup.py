@@ -0,0 +1,89 @@
+import threading
+import time
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class StartupPipeline(QObject):
+    """Runs startup stages on background threads, each as soon as its dependencies are ready
+
+    Each stage is a function taking the results of earlier stages (a dict
+    by stage name) and returning its own result. stage_ready/stage_failed
+    arrive on the GUI thread, where the results should be put to use; a
+    stage whose dependency failed is reported as failed without running.
+    """
+    stage_ready = pyqtSignal(str, object)
+    stage_failed = pyqtSignal(str, str)
+    finished = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self._stages = {}  # name -> (func, dependencies)
+        self._lock = threading.Lock()
+        self._started = set()
+        self._done = set()
+        self.results = {}
+        self.failed = {}
+        self.timings = {}  # name -> (start offset, duration) in seconds
+        self._t0 = None
+
+    def add(self, name, func, after=()):
+        """Add a stage that runs after the named stages have succeeded"""
+        self._stages[name] = (func, tuple(after))
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        self._schedule()
+
+    def _schedule(self):
+        with self._lock:
+            runnable, skipped = [], []
+            for name, (func, after) in self._stages.items():
+                if name in self._started:
+                    continue
+                if any(dep in self.failed for dep in after):
+                    skipped.append(name)
+                elif all(dep in self.results for dep in after):
+                    runnable.append(name)
+            self._started.update(runnable + skipped)
+
+        for name in runnable:
+            threading.Thread(target=self._run_stage, args=(name,), daemon=True).start()
+        for name in skipped:
+            self._complete(name, error='a stage it depends on failed')
+
+    def _run_stage(self, name):
+        func = self._stages[name][0]
+        start = time.perf_counter()
+        try:
+            result = func(self.results)
+        except Exception as e:
+            self.timings[name] = (start - self._t0, time.perf_counter() - start)
+            self._complete(name, error=str(e))
+            return
+        self.timings[name] = (start - self._t0, time.perf_counter() - start)
+        self._complete(name, result=result)
+
+    def _complete(self, name, result=None, error=None):
+        with self._lock:
+            if error is None:
+                self.results[name] = result
+            else:
+                self.failed[name] = error
+            self._done.add(name)
+            all_done = len(self._done) == len(self._stages)
+
+        if error is None:
+            self.stage_ready.emit(name, result)
+        else:
+            self.stage_failed.emit(name, error)
+        self._schedule()
+        if all_done:
+            self.finished.emit()
+
+    def report(self):
+        """One line per stage: when it started and how long it took"""
+        lines = []
+        for name, (offset, duration) in sorted(self.timings.items(), key=lambda item: item[1][0]):
+            status = 'failed' if name in self.failed else 'ok'
+            lines.append(f"  {name:<10} +{offset * 1000:6.0f} ms  {duration * 1000:6.0f} ms  {status}")
+        return '\n'.join(lines)
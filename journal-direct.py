@@ -13,10 +13,18 @@ sys.path.insert(0, str(Path(__file__).parent))
 from PyQt6.QtWidgets import QApplication, QMessageBox
 from utils.config import Config
 from core.llm_handler import LLMHandler
+from core.async_llm_handler import AsyncLLMHandler
 from core.journal_writer import JournalWriter
+from core.model_warmer import ModelWarmer
+from core.generation_profiles import GenerationProfiles
+from core.health_monitor import HealthMonitor
+from gui.async_bridge import AsyncBridge
 from gui.chat_window import ChatWindow
 from gui.settings import SettingsDialog
 from utils.style_analyzer import StyleAnalyzer
+from utils.style_cache import StyleCache
+from utils.vault_index import VaultIndex
+from utils.search_index import open_search_index
 
 def main():
     app = QApplication(sys.argv)
@@ -42,39 +50,46 @@ def main():
     # Initialize components
     print("Initializing components...")
     model = config.get('ollama_model', 'tinyllama')
-    llm_handler = LLMHandler(model=model)
+    keep_alive = f"{config.get('model_idle_minutes', 10)}m"
+    handler_class = LLMHandler
+    bridge = None
+    if config.get('async_llm', False):
+        handler_class = AsyncLLMHandler
+        bridge = AsyncBridge()
+    llm_handler = handler_class(model=model, context_budget=config.get('context_token_budget', 1500),
+                                speculative_drafting=config.get('speculative_drafting', False),
+                                keep_alive=keep_alive, writer_model=config.get('writer_model', ''),
+                                profiles=GenerationProfiles())
+    # Start loading the model now; it is ready by the time the window is up
+    ModelWarmer(model, keep_alive=keep_alive).warm()
     
-    # Analyze writing style if needed
-    if not config.get('writing_style_analyzed', False):
-        print("Analyzing your writing style...")
-        try:
-            analyzer = StyleAnalyzer(vault_path)
-            style_profile = analyzer.analyze_existing_journals()
-            style_instructions = analyzer.get_style_instructions()
-            llm_handler.set_style_instructions(style_instructions)
+    # Analyze writing style (cached, so only new or changed notes are parsed)
+    print("Analyzing your writing style...")
+    vault_index = VaultIndex(vault_path)
+    analyzer = StyleAnalyzer(vault_path, cache=StyleCache(), index=vault_index)
+    try:
+        style_profile = analyzer.analyze_existing_journals()
+        style_instructions = analyzer.get_style_instructions()
+        llm_handler.set_style_instructions(style_instructions)
+        if not config.get('writing_style_analyzed', False):
             config.set('writing_style_analyzed', True)
-            print("Writing style analyzed!")
-        except Exception as e:
-            print(f"Style analysis error (non-fatal): {e}")
+        print("Writing style analyzed!")
+    except Exception as e:
+        print(f"Style analysis error (non-fatal): {e}")
     
     # Initialize journal writer
-    journal_writer = JournalWriter(vault_path)
+    journal_writer = JournalWriter(vault_path, style_analyzer=analyzer, index=vault_index,
+                                   append_in_place=config.get('append_in_place', True),
+                                   template_path=config.get('template_path', ''),
+                                   search_index=open_search_index(vault_path, index=vault_index))
     
-    # Check if Ollama is running
-    try:
-        import ollama
-        ollama.list()
-    except Exception as e:
-        QMessageBox.critical(
-            None,
-            'Ollama Not Running',
-            f'Please start Ollama first:\n\nRun: ollama serve\n\nError: {str(e)}'
-        )
-        return
+    # Check Ollama in the background; the window shows 'connecting...' meanwhile
+    health = HealthMonitor()
+    health.start()
     
     # Create and show chat window
     print("Opening chat window...")
-    chat_window = ChatWindow(llm_handler, journal_writer)
+    chat_window = ChatWindow(llm_handler, journal_writer, bridge=bridge, health=health)
     
     # Add menu bar
     from PyQt6.QtWidgets import QMenuBar
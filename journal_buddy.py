@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Terminal front end for Journal Buddy - no display or Qt needed
+
+    python -m journal_buddy chat           journal in the terminal
+    python -m journal_buddy search WORDS   search past entries
+    python -m journal_buddy benchmark      benchmark installed Ollama models
+    python -m journal_buddy import-check   check startup imports stay light
+
+Only light modules are imported before the first prompt. The ollama client,
+the model and the style analysis load in the background while you type.
+"""
+import time
+
+_START = time.perf_counter()
+
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Time from process start to the first prompt
+STARTUP_BUDGET = 0.150
+# Must not be imported before the first prompt
+HEAVY_MODULES = ('PyQt6', 'ollama', 'httpx', 'apscheduler', 'plyer')
+
+
+def elapsed():
+    return time.perf_counter() - _START
+
+
+class TerminalSession:
+    """One journaling conversation in the terminal"""
+
+    def __init__(self, config, timings=False):
+        from core.llm_handler import LLMHandler
+        from core.generation_profiles import GenerationProfiles
+
+        self.config = config
+        self.timings = timings
+        self.vault_path = config.get_vault_path()
+        self.analyzer = None
+        self.index = None
+
+        model = config.get('ollama_model', 'llama3.1')
+        keep_alive = f"{config.get('model_idle_minutes', 10)}m"
+        self.llm_handler = LLMHandler(model=model, context_budget=config.get('context_token_budget', 1500),
+                                      speculative_drafting=config.get('speculative_drafting', False),
+                                      keep_alive=keep_alive, writer_model=config.get('writer_model', ''),
+                                      profiles=GenerationProfiles())
+
+        # Style only matters for the entry, so it is worked out while the user chats
+        self.style_thread = threading.Thread(target=self.analyze_style, daemon=True)
+
+    def log(self, message):
+        if self.timings:
+            print(f"[{elapsed() * 1000:.0f} ms] {message}", file=sys.stderr)
+
+    def analyze_style(self):
+        """Analyze the writing style (background thread)"""
+        from utils.style_analyzer import StyleAnalyzer
+        from utils.style_cache import StyleCache
+        from utils.vault_index import VaultIndex
+
+        self.index = VaultIndex(self.vault_path)
+        self.analyzer = StyleAnalyzer(self.vault_path, cache=StyleCache(), index=self.index)
+        try:
+            self.analyzer.analyze_existing_journals()
+            self.llm_handler.set_style_instructions(self.analyzer.get_style_instructions())
+        except Exception as e:
+            print(f"Style analysis error (non-fatal): {e}", file=sys.stderr)
+        self.log('style analysis done')
+
+    def start_background_work(self):
+        from core.model_warmer import ModelWarmer
+
+        self.style_thread.start()
+        ModelWarmer(self.llm_handler.model, keep_alive=self.llm_handler.keep_alive).warm()
+
+    def run(self):
+        greeting = self.llm_handler.start_conversation()
+        print(f"🤖 {greeting}")
+        self.log('first prompt')
+        self.start_background_work()
+
+        is_done = False
+        while not is_done:
+            try:
+                message = input('👤 ').strip()
+            except (EOFError, KeyboardInterrupt):
+                # Ctrl-D / Ctrl-C: write up what we have
+                print()
+                break
+            if not message:
+                continue
+
+            print('🤖 ', end='', flush=True)
+            for chunk, is_done in self.llm_handler.chat_stream(message):
+                print(chunk, end='', flush=True)
+            print()
+
+        if not any(msg['role'] == 'user' for msg in self.llm_handler.conversation_history):
+            print('Nothing to write today.')
+            return 0
+
+        return self.write_entry()
+
+    def write_entry(self):
+        from core.journal_writer import JournalWriter, write_draft, close_draft
+        from core.llm_handler import EntryInterrupted
+        from utils.search_index import open_search_index
+
+        self.style_thread.join()
+        writer = JournalWriter(self.vault_path, style_analyzer=self.analyzer, index=self.index,
+                               append_in_place=self.config.get('append_in_place', True),
+                               template_path=self.config.get('template_path', ''),
+                               search_index=open_search_index(self.vault_path, index=self.index))
+
+        print('\n📝 Writing your journal entry...\n')
+        # Stream into a sidecar draft so an interrupted run loses nothing
+        draft = writer.start_draft()
+        parts = []
+        interrupted = None
+        try:
+            for chunk in self.llm_handler.generate_journal_entry_stream():
+                parts.append(chunk)
+                write_draft(draft, chunk)
+                print(chunk, end='', flush=True)
+        except EntryInterrupted as e:
+            interrupted = e
+        finally:
+            close_draft(draft)
+        print()
+
+        if interrupted is not None and not draft.abandoned:
+            # Partial, so it stays a draft (with your messages) until the next start
+            print(f"\n⚠️  The journal entry was cut off ({interrupted}). It is kept in {draft.path.name}")
+            return 1
+        if draft.abandoned:
+            entry = ''.join(parts).strip()
+            filepath = writer.create_journal_entry(entry) if entry else None
+        else:
+            filepath = writer.commit_draft(draft)
+        if filepath is None:
+            print('The generated entry was empty, nothing saved.')
+            return 1
+        print(f"\n✅ Journal saved to: {filepath}")
+        return 0
+
+
+def chat(args):
+    from utils.config import Config
+
+    config = Config()
+    vault_path = config.get_vault_path()
+    if not vault_path or not Path(vault_path).exists():
+        print('Please set your vault path first (run main.py once, or edit ~/.journal-buddy/config.json)')
+        return 1
+
+    return TerminalSession(config, timings=args.timings).run()
+
+
+def search(args):
+    from utils.config import Config
+    from utils.search_index import open_search_index
+
+    vault_path = Config().get_vault_path()
+    if not vault_path or not Path(vault_path).exists():
+        print('Please set your vault path first (run main.py once, or edit ~/.journal-buddy/config.json)')
+        return 1
+
+    index = open_search_index(vault_path)
+    if index is None:
+        return 1
+    # Only notes changed since the last run are read
+    index.refresh()
+    hits = index.search(' '.join(args.words), limit=args.limit)
+    for hit in hits:
+        print(f"{hit.day} {hit.time:<5}  {' '.join(hit.snippet.split())}")
+    if not hits:
+        print('No entries found.')
+    return 0
+
+
+def benchmark(args):
+    from core.model_benchmark import main as benchmark_main
+    return benchmark_main(args.rest)
+
+
+def import_check(args):
+    """Import what the chat needs before its first prompt, then check time and modules"""
+    from utils.config import Config
+    from core.llm_handler import LLMHandler
+    from core.generation_profiles import GenerationProfiles
+    from core.model_warmer import ModelWarmer
+
+    startup = elapsed()
+    heavy = sorted(name for name in sys.modules if name.split('.')[0] in HEAVY_MODULES)
+    print(f"Startup imports: {startup * 1000:.0f} ms (budget {STARTUP_BUDGET * 1000:.0f} ms)")
+    if heavy:
+        print(f"Heavy modules imported at startup: {', '.join(heavy)}")
+        return 1
+    if startup > STARTUP_BUDGET:
+        print("Startup is over budget (see: python -X importtime -m journal_buddy import-check)")
+        return 1
+    print("OK")
+    return 0
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='journal_buddy', description='Journal Buddy in the terminal')
+    commands = parser.add_subparsers(dest='command')
+
+    chat_parser = commands.add_parser('chat', help='journal in the terminal')
+    chat_parser.add_argument('--timings', action='store_true', help='print startup timings to stderr')
+    chat_parser.set_defaults(func=chat)
+
+    search_parser = commands.add_parser('search', help='search past entries')
+    search_parser.add_argument('words', nargs='+')
+    search_parser.add_argument('--limit', type=int, default=20, help='most results to show')
+    search_parser.set_defaults(func=search)
+
+    benchmark_parser = commands.add_parser('benchmark', help='benchmark installed models')
+    benchmark_parser.add_argument('rest', nargs=argparse.REMAINDER)
+    benchmark_parser.set_defaults(func=benchmark)
+
+    check_parser = commands.add_parser('import-check', help='check startup import time')
+    check_parser.set_defaults(func=import_check)
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0].startswith('-') and argv[0] not in ('-h', '--help')):
+        # Default to chatting
+        argv = ['chat'] + argv
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import sys
 import signal
+import threading
+import time
 from pathlib import Path
 from PyQt6.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QMessageBox
 from PyQt6.QtGui import QIcon, QPixmap, QPainter, QColor
@@ -11,16 +13,29 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from utils.config import Config
 from utils.style_analyzer import StyleAnalyzer
+from utils.style_cache import StyleCache
+from utils.vault_index import VaultIndex
+from utils.search_index import open_search_index
 from core.llm_handler import LLMHandler
+from core.async_llm_handler import AsyncLLMHandler
 from core.journal_writer import JournalWriter
 from core.scheduler import NotificationScheduler
+from core.model_warmer import ModelWarmer
+from core.generation_profiles import GenerationProfiles
+from core.health_monitor import HealthMonitor
+from core.notifier import get_notifier
+from gui.async_bridge import AsyncBridge
 from gui.chat_window import ChatWindow
+from gui.event_bus import EventBus
+from gui.search_window import SearchWindow
 from gui.settings import SettingsDialog
+from gui.startup import StartupPipeline
 
 
 class JournalBuddyApp:
     def __init__(self):
         try:
+            start = time.perf_counter()
             self.app = QApplication(sys.argv)
             self.app.setApplicationName('Journal Buddy')
             
@@ -30,15 +45,41 @@ class JournalBuddyApp:
             self.journal_writer = None
             self.scheduler = None
             self.chat_window = None
+            self.vault_index = None
+            self.search_index = None
+            self.search_window = None
+            # Closed chat windows still writing their entry, kept alive until it is saved
+            self.retired_windows = set()
+            self.model_warmer = None
+            self.async_bridge = None
             self.tray_icon = None
+            self.status_action = None
+            self.analyzer = None
+            self.pipeline = None
+            self.pending_open = False
+            # Held while a style stage hands its result over and while a new pipeline replaces it
+            self.style_lock = threading.Lock()
+            
+            # Scheduler jobs and monitor threads reach the GUI thread through here
+            self.events = EventBus()
+            self.events.subscribe('reminder', self.open_chat_window)
+            self.events.subscribe('prewarm', self.prewarm_for_reminder)
+            
+            # Watch Ollama in the background so nothing waits on it
+            self.health = HealthMonitor()
+            self.health.start()
+            
+            # Started by sentinel.py for one reminder: no tray or scheduler, exit when done
+            self.reminder_mode = '--reminder' in sys.argv[1:]
             
             # Check if system tray is available
-            self.has_tray = QSystemTrayIcon.isSystemTrayAvailable()
+            self.has_tray = QSystemTrayIcon.isSystemTrayAvailable() and not self.reminder_mode
             
             if self.has_tray:
                 # Create system tray icon if available
                 self.app.setQuitOnLastWindowClosed(False)  # Keep running in tray
                 self.create_tray_icon()
+                print(f"Tray ready after {(time.perf_counter() - start) * 1000:.0f} ms")
             else:
                 # No tray - app quits when windows close
                 print("Note: Running without system tray")
@@ -49,6 +90,8 @@ class JournalBuddyApp:
                 self.show_settings()
             else:
                 self.initialize_components()
+                if self.reminder_mode:
+                    self.notify_reminder()
                 # If no tray, open chat window directly
                 if not self.has_tray:
                     print("Opening chat window (no system tray available)")
@@ -96,8 +139,17 @@ class JournalBuddyApp:
             # Create menu
             menu = QMenu()
             
+            self.status_action = menu.addAction(self.health.status.describe())
+            self.status_action.setEnabled(False)
+            menu.addSeparator()
+            
             journal_action = menu.addAction('✍️ Open Journal')
             journal_action.triggered.connect(self.open_chat_window)
+            # Hovering is a strong hint a session is about to start
+            journal_action.hovered.connect(self.prewarm_model)
+            
+            search_action = menu.addAction('🔍 Search Journal')
+            search_action.triggered.connect(self.open_search_window)
             
             settings_action = menu.addAction('⚙️ Settings')
             settings_action.triggered.connect(self.show_settings)
@@ -111,6 +163,9 @@ class JournalBuddyApp:
             self.tray_icon.activated.connect(self.tray_icon_activated)
             self.tray_icon.show()
             
+            self.events.subscribe('health', self.update_tray_status)
+            self.health.add_listener(lambda status: self.events.post('health', status))
+            
             # Show welcome message
             if QSystemTrayIcon.isSystemTrayAvailable():
                 self.tray_icon.showMessage(
@@ -123,13 +178,24 @@ class JournalBuddyApp:
             print(f"Tray icon error (non-fatal): {e}")
             # App can still run without tray icon
     
+    def update_tray_status(self, status):
+        """Show Ollama's status in the tray tooltip and menu"""
+        text = status.describe()
+        self.tray_icon.setToolTip(f'Journal Buddy - {text}')
+        self.status_action.setText(text)
+    
     def tray_icon_activated(self, reason):
         """Handle tray icon click"""
         if reason == QSystemTrayIcon.ActivationReason.DoubleClick:
             self.open_chat_window()
     
     def initialize_components(self):
-        """Initialize LLM, journal writer, and scheduler"""
+        """Start bringing up the LLM handler, journal writer, scheduler and style analysis
+        
+        Each runs on a background thread as soon as what it needs is ready,
+        so the tray and chat window stay responsive on large vaults.
+        Returns False if the vault isn't configured.
+        """
         vault_path = self.config.get_vault_path()
         
         if not vault_path or not Path(vault_path).exists():
@@ -139,52 +205,177 @@ class JournalBuddyApp:
                 'Please configure your Obsidian vault path in settings'
             )
             self.show_settings()
-            return
+            return False
+        
+        if self.config.get('async_llm', False) and self.async_bridge is None:
+            # Coroutines on one asyncio loop instead of a thread per request
+            self.async_bridge = AsyncBridge()
+        
+        pipeline = StartupPipeline()
+        pipeline.add('llm', self.build_llm_handler)
+        pipeline.add('writer', lambda results: self.build_journal_writer(vault_path))
+        if not self.reminder_mode and self.scheduler is None:
+            # A retry after a failed start keeps the reminder that is already scheduled
+            pipeline.add('scheduler', self.start_scheduler)
+        # Style only matters once an entry is written, so it goes last
+        pipeline.add('style', lambda results: self.analyze_style(pipeline, results), after=('llm', 'writer'))
+        pipeline.add('search', self.index_vault, after=('writer',))
         
-        # Initialize LLM handler
+        pipeline.stage_ready.connect(lambda name, result: self.stage_ready(pipeline, name, result))
+        pipeline.stage_failed.connect(lambda name, error: self.stage_failed(pipeline, name, error))
+        pipeline.finished.connect(lambda: print(f"Startup stages:\n{pipeline.report()}"))
+        with self.style_lock:
+            self.pipeline = pipeline
+        pipeline.start()
+        return True
+    
+    def build_llm_handler(self, results):
+        """Startup stage: the LLM handler (the model is unloaded after model_idle_minutes unused)"""
         model = self.config.get('ollama_model', 'llama3.1')
-        self.llm_handler = LLMHandler(model=model)
+        keep_alive = f"{self.config.get('model_idle_minutes', 10)}m"
+        handler_class = AsyncLLMHandler if self.config.get('async_llm', False) else LLMHandler
+        llm_handler = handler_class(model=model, context_budget=self.config.get('context_token_budget', 1500),
+                                    speculative_drafting=self.config.get('speculative_drafting', False),
+                                    keep_alive=keep_alive, writer_model=self.config.get('writer_model', ''),
+                                    profiles=GenerationProfiles())
+        # Entries wait for the style stage
+        llm_handler.expect_style()
+        return llm_handler, ModelWarmer(model, keep_alive=keep_alive)
+    
+    def build_journal_writer(self, vault_path):
+        """Startup stage: vault index, style analyzer and search index (neither run yet) and journal writer"""
+        vault_index = VaultIndex(vault_path)
+        analyzer = StyleAnalyzer(vault_path, cache=StyleCache(), index=vault_index)
+        search_index = open_search_index(vault_path, index=vault_index)
+        journal_writer = JournalWriter(vault_path, style_analyzer=analyzer, index=vault_index,
+                                       append_in_place=self.config.get('append_in_place', True),
+                                       template_path=self.config.get('template_path', ''),
+                                       search_index=search_index)
+        # Save entries left half-written last time, before anything new is generated
+        try:
+            for filepath in journal_writer.recover_drafts():
+                get_notifier().notify('Journal Buddy', f'Recovered an unfinished journal entry into {filepath.name}')
+        except Exception as e:
+            print(f"Draft recovery error: {e}")
+        return vault_index, analyzer, journal_writer, search_index
+    
+    def start_scheduler(self, results):
+        """Startup stage: the reminder (and the model pre-warm a few minutes before it)"""
+        # The jobs only post events, the work happens on the GUI thread
+        scheduler = NotificationScheduler(callback=lambda: self.events.post('reminder'),
+                                          prewarm_callback=lambda: self.events.post('prewarm'),
+                                          prewarm_minutes=self.config.get('prewarm_minutes', 5))
+        scheduler.start(self.config.get_notification_time())
+        return scheduler
+    
+    def analyze_style(self, pipeline, results):
+        """Startup stage: analyze writing style (cached, so only new or changed notes are parsed)
         
-        # Analyze writing style if not done yet
+        A pipeline superseded meanwhile (e.g. the vault changed again) leaves
+        the handler alone: it may be waiting for the new vault's style.
+        """
+        llm_handler = results['llm'][0]
+        analyzer = results['writer'][1]
+        try:
+            analyzer.analyze_existing_journals()
+            instructions = analyzer.get_style_instructions()
+            with self.style_lock:
+                if pipeline is self.pipeline:
+                    llm_handler.set_style_instructions(instructions)
+        finally:
+            with self.style_lock:
+                if pipeline is self.pipeline:
+                    llm_handler.style_ready.set()
         if not self.config.get('writing_style_analyzed', False):
-            try:
-                analyzer = StyleAnalyzer(vault_path)
-                style_profile = analyzer.analyze_existing_journals()
-                style_instructions = analyzer.get_style_instructions()
-                self.llm_handler.set_style_instructions(style_instructions)
-                self.config.set('writing_style_analyzed', True)
-            except Exception as e:
-                print(f"Style analysis error: {e}")
-        
-        # Initialize journal writer
-        self.journal_writer = JournalWriter(vault_path)
-        
-        # Initialize scheduler
-        self.scheduler = NotificationScheduler(callback=self.open_chat_window)
-        notification_time = self.config.get_notification_time()
-        self.scheduler.start(notification_time)
+            self.config.set('writing_style_analyzed', True)
+    
+    def index_vault(self, results):
+        """Startup stage: bring the search index up to date (only new or changed notes are read)"""
+        search_index = results['writer'][3]
+        return search_index.refresh() if search_index is not None else 0
+    
+    def stage_ready(self, pipeline, name, result):
+        """Put a finished startup stage to use (GUI thread)"""
+        if pipeline is not self.pipeline:
+            # Superseded by a newer initialization
+            if name == 'scheduler':
+                result.stop()
+            return
+        
+        if name == 'llm':
+            self.llm_handler, self.model_warmer = result
+        elif name == 'writer':
+            self.vault_index, self.analyzer, self.journal_writer, self.search_index = result
+            if self.chat_window is not None:
+                # The next entry goes to the new vault
+                self.chat_window.journal_writer = self.journal_writer
+            if self.search_window is not None:
+                self.search_window.search_index = self.search_index
+        elif name == 'scheduler':
+            self.scheduler = result
+        
+        if self.pending_open and self.llm_handler and self.journal_writer:
+            self.pending_open = False
+            self.open_chat_window()
+    
+    def stage_failed(self, pipeline, name, error):
+        print(f"Startup stage '{name}' failed: {error}")
+        if pipeline is not self.pipeline:
+            return
+        
+        if name in ('style', 'writer') and 'llm' in pipeline.results:
+            # Write entries without style instructions rather than waiting
+            pipeline.results['llm'][0].style_ready.set()
+        
+        if name in ('llm', 'writer'):
+            # Nothing can be journaled without them: say so, and start over on the next open
+            with self.style_lock:
+                self.pipeline = None
+            self.pending_open = False
+            if name == 'writer':
+                self.journal_writer = None
+            what = 'connect to the language model' if name == 'llm' else 'open the journal vault'
+            QMessageBox.warning(None, 'Journal Buddy', f"Couldn't {what}:\n{error}")
+    
+    def notify_reminder(self):
+        """Desktop notification for a sentinel-launched reminder (shown off the GUI thread)"""
+        get_notifier().notify('Journal Time! 📝', 'Time to reflect on your day')
+    
+    def prewarm_model(self):
+        """Start loading the model so the first reply doesn't wait for it"""
+        if self.model_warmer:
+            self.model_warmer.warm()
+    
+    def prewarm_for_reminder(self):
+        """Load the model ahead of the reminder and keep it until the session can start"""
+        if self.model_warmer:
+            minutes = self.config.get('prewarm_minutes', 5) + self.config.get('model_idle_minutes', 10)
+            self.model_warmer.warm(keep_alive=f'{minutes}m')
     
     def open_chat_window(self):
         """Open the chat window for journaling"""
         if not self.llm_handler or not self.journal_writer:
-            self.initialize_components()
-            if not self.llm_handler:  # Still not initialized
+            # Open as soon as the handler and writer are up
+            if self.pipeline is not None or self.initialize_components():
+                self.pending_open = True
+            return
+        
+        if self.chat_window is not None:
+            if self.chat_window.isVisible():
+                # E.g. the reminder fired while a conversation is open
+                self.chat_window.raise_()
+                self.chat_window.activateWindow()
                 return
+            self.retire_chat_window()
         
-        # Check if Ollama is running
-        try:
-            import ollama
-            ollama.list()  # Test connection
-        except Exception as e:
-            QMessageBox.critical(
-                None,
-                'Ollama Not Running',
-                f'Please start Ollama first:\n\nRun: ollama serve\n\nError: {str(e)}'
-            )
-            return
+        self.prewarm_model()
+        
+        # The window shows 'connecting...' until the monitor hears from Ollama
+        self.health.check_now()
         
         # Create and show chat window
-        self.chat_window = ChatWindow(self.llm_handler, self.journal_writer)
+        bridge = self.async_bridge if isinstance(self.llm_handler, AsyncLLMHandler) else None
+        self.chat_window = ChatWindow(self.llm_handler, self.journal_writer, bridge=bridge, health=self.health)
         
         # Add menu bar for systems without tray
         if not self.has_tray:
@@ -194,6 +385,9 @@ class JournalBuddyApp:
             # File menu
             file_menu = menubar.addMenu('&File')
             
+            search_action = file_menu.addAction('🔍 Search Journal')
+            search_action.triggered.connect(self.open_search_window)
+            
             settings_action = file_menu.addAction('⚙️ Settings')
             settings_action.triggered.connect(self.show_settings)
             
@@ -204,14 +398,110 @@ class JournalBuddyApp:
         
         self.chat_window.show()
     
+    def retire_chat_window(self):
+        """Let go of the previous (hidden) chat window
+        
+        Closing it stops its chat worker and health listener. A window whose
+        entry is still being written stays alive until the entry is saved,
+        so its threads aren't destroyed while running.
+        """
+        window, self.chat_window = self.chat_window, None
+        window.close()
+        if window.writing_entry:
+            def release():
+                window.entry_finished.disconnect(release)
+                self.retired_windows.discard(window)
+            self.retired_windows.add(window)
+            window.entry_finished.connect(release)
+    
+    def open_search_window(self):
+        """Open the search box over past entries"""
+        if self.search_index is None:
+            if self.journal_writer is not None:
+                QMessageBox.information(None, 'Search Unavailable',
+                                        "This Python's SQLite has no full-text search (FTS5)")
+            # Otherwise it comes up with the journal writer, moments after startup
+            return
+        
+        if self.search_window is None:
+            self.search_window = SearchWindow(self.search_index)
+        self.search_window.show()
+        self.search_window.raise_()
+        self.search_window.activateWindow()
+    
     def show_settings(self):
         """Show settings dialog"""
+        previous = self.config.snapshot()
         dialog = SettingsDialog(self.config)
         if dialog.exec():
-            # Reinitialize components with new settings
+            self.apply_settings(previous)
+    
+    def apply_settings(self, previous):
+        """Apply only what changed since `previous` (a config snapshot)
+        
+        The running handler, writer and scheduler are updated in place, so
+        a conversation in progress carries on with the new settings.
+        """
+        if self.pipeline is None or not self.llm_handler or not self.journal_writer or \
+                (not self.scheduler and not self.reminder_mode):
+            # Nothing (or not everything) is up yet: start from scratch
             if self.scheduler:
                 self.scheduler.stop()
+                self.scheduler = None
             self.initialize_components()
+            return
+        
+        changed = lambda key: self.config.get(key) != previous.get(key)
+        
+        if changed('notification_time') and self.scheduler:
+            self.scheduler.set_notification_time(self.config.get_notification_time())
+        
+        if changed('ollama_model') or changed('writer_model'):
+            model = self.config.get('ollama_model', 'llama3.1')
+            writer_model = self.config.get('writer_model', '') or model
+            # Models no longer used are unloaded before the new one loads, so both aren't in RAM
+            stale = [warmer for warmer in (self.model_warmer, self.llm_handler.writer_warmer)
+                     if warmer is not None and warmer.model not in (model, writer_model)]
+            self.llm_handler.set_models(model, writer_model)
+            self.model_warmer = ModelWarmer(model, keep_alive=self.llm_handler.keep_alive)
+            threading.Thread(target=self.swap_models, args=(stale,), daemon=True).start()
+        
+        if changed('speculative_drafting'):
+            self.llm_handler.set_speculative_drafting(self.config.get('speculative_drafting', False))
+        
+        # After the model swap: the rebuild hands the current handler and warmer on
+        if changed('vault_path'):
+            self.rebuild_vault()
+        elif changed('template_path'):
+            self.journal_writer.set_template_path(self.config.get('template_path', ''))
+    
+    def swap_models(self, stale):
+        """Unload models no longer in use, then load the new chat model (background thread)"""
+        seen = set()
+        for warmer in stale:
+            if warmer.model not in seen:
+                seen.add(warmer.model)
+                warmer.unload()
+        self.prewarm_model()
+    
+    def rebuild_vault(self):
+        """Rebuild the vault index, journal writer and style for a new vault (handler and scheduler stay)"""
+        vault_path = self.config.get_vault_path()
+        llm_handler, model_warmer = self.llm_handler, self.model_warmer
+        
+        pipeline = StartupPipeline()
+        pipeline.add('llm', lambda results: (llm_handler, model_warmer))
+        pipeline.add('writer', lambda results: self.build_journal_writer(vault_path))
+        pipeline.add('style', lambda results: self.analyze_style(pipeline, results), after=('llm', 'writer'))
+        pipeline.add('search', self.index_vault, after=('writer',))
+        
+        pipeline.stage_ready.connect(lambda name, result: self.stage_ready(pipeline, name, result))
+        pipeline.stage_failed.connect(lambda name, error: self.stage_failed(pipeline, name, error))
+        with self.style_lock:
+            # Entries wait for the new style; the old pipeline's style no longer counts
+            self.pipeline = pipeline
+            llm_handler.expect_style()
+        pipeline.start()
     
     def quit_app(self):
         """Quit the application"""
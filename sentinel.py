@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Low-memory reminder sentinel for Journal Buddy
+
+Sleeps until the daily reminder and only then starts the full app
+(main.py --reminder), which exits again once the chat window is closed.
+Nothing but the standard library is imported, so it idles at the size
+of a bare Python interpreter instead of keeping Qt, the ollama client
+and APScheduler resident all day.
+
+    python3 sentinel.py                  run until stopped
+    python3 sentinel.py --systemd-timer  print a systemd timer for the reminder time instead
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CONFIG_FILE = Path.home() / '.journal-buddy' / 'config.json'
+# When the last reminder fired, so a restart doesn't fire it again
+STATE_FILE = Path.home() / '.journal-buddy' / 'sentinel_state.json'
+DEFAULT_TIME = '21:00'
+APP = Path(__file__).parent / 'main.py'
+# Longest single sleep, so config changes and suspend/resume are noticed (seconds)
+MAX_SLEEP = 60
+# A reminder missed while the machine was asleep still fires if we wake within this
+MISSED_GRACE = timedelta(hours=2)
+
+
+def parse_time(value):
+    """(hour, minute) for an "HH:MM" string, or None if it isn't one"""
+    try:
+        hour, minute = map(int, str(value).split(':'))
+    except ValueError:
+        return None
+    if 0 <= hour < 24 and 0 <= minute < 60:
+        return hour, minute
+    return None
+
+
+def _minutes(data, key, default):
+    value = data.get(key, default)
+    return value if isinstance(value, (int, float)) and value >= 0 else default
+
+
+def load_config():
+    """The few settings the sentinel needs, straight from config.json
+
+    Bad values fall back to the defaults, so a typo in the config can't
+    turn the service into a crash loop.
+    """
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+
+    notification_time = data.get('notification_time', DEFAULT_TIME)
+    if parse_time(notification_time) is None:
+        print(f"Invalid notification_time {notification_time!r}, using {DEFAULT_TIME}", flush=True)
+        notification_time = DEFAULT_TIME
+    return {
+        'notification_time': notification_time,
+        'prewarm_minutes': _minutes(data, 'prewarm_minutes', 5),
+        'model_idle_minutes': _minutes(data, 'model_idle_minutes', 10),
+        'ollama_model': data.get('ollama_model') or 'llama3.1',
+    }
+
+
+def load_last_fired():
+    """When the last reminder fired, as saved by save_last_fired (None if unknown)"""
+    try:
+        with open(STATE_FILE, 'r') as f:
+            return datetime.fromisoformat(json.load(f)['last_fired'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_last_fired(when):
+    try:
+        tmp_file = STATE_FILE.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump({'last_fired': when.isoformat()}, f)
+        os.replace(tmp_file, STATE_FILE)
+    except OSError as e:
+        print(f"State file error: {e}", flush=True)
+
+
+def next_reminder(now, notification_time, last_fired=None):
+    """The next reminder due after `now` (or one just missed, within MISSED_GRACE)"""
+    hour, minute = parse_time(notification_time) or parse_time(DEFAULT_TIME)
+    today = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if today > now:
+        return today
+    if now - today <= MISSED_GRACE and (last_fired is None or last_fired < today):
+        return today
+    return today + timedelta(days=1)
+
+
+def prewarm(config):
+    """Ask Ollama to load the model before the reminder (best effort)"""
+    import urllib.request
+
+    host = os.environ.get('OLLAMA_HOST', 'http://127.0.0.1:11434')
+    if '://' not in host:
+        host = f'http://{host}'
+    minutes = config['prewarm_minutes'] + config['model_idle_minutes']
+    body = json.dumps({'model': config['ollama_model'], 'prompt': '', 'keep_alive': f'{minutes}m'})
+    request = urllib.request.Request(f'{host}/api/generate', data=body.encode(),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        urllib.request.urlopen(request, timeout=120).close()
+    except Exception as e:
+        print(f"Pre-warm error: {e}", flush=True)
+
+
+def launch_app():
+    """Start the full app for this reminder, detached from the sentinel"""
+    import subprocess
+
+    subprocess.Popen([sys.executable, str(APP), '--reminder'], start_new_session=True,
+                     stdin=subprocess.DEVNULL)
+
+
+def sleep_until(when):
+    """Sleep until `when`; returns False early if the config changed meanwhile"""
+    mtime = CONFIG_FILE.stat().st_mtime if CONFIG_FILE.exists() else None
+    while True:
+        remaining = (when - datetime.now()).total_seconds()
+        if remaining <= 0:
+            return True
+        time.sleep(min(remaining, MAX_SLEEP))
+        if (CONFIG_FILE.stat().st_mtime if CONFIG_FILE.exists() else None) != mtime:
+            return False
+
+
+def run():
+    last_fired = load_last_fired()
+    while True:
+        config = load_config()
+        reminder = next_reminder(datetime.now(), config['notification_time'], last_fired)
+        print(f"Next reminder: {reminder:%Y-%m-%d %H:%M}", flush=True)
+
+        if config['prewarm_minutes'] > 0:
+            warm_at = reminder - timedelta(minutes=config['prewarm_minutes'])
+            if warm_at > datetime.now():
+                if not sleep_until(warm_at):
+                    continue
+                prewarm(config)
+
+        if not sleep_until(reminder):
+            continue
+        last_fired = reminder
+        save_last_fired(reminder)
+        launch_app()
+
+
+def systemd_timer():
+    """A systemd timer (to pair with journal-buddy-reminder.service) for the configured time"""
+    config = load_config()
+    return f"""[Unit]
+Description=Journal Buddy daily reminder
+
+[Timer]
+OnCalendar=*-*-* {config['notification_time']}:00
+Persistent=true
+
+[Install]
+WantedBy=timers.target
+"""
+
+
+def main():
+    if '--systemd-timer' in sys.argv[1:]:
+        print(systemd_timer(), end='')
+        return
+    try:
+        run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,116 @@
+import atexit
 import json
 import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from types import MappingProxyType
+
+# Writes are coalesced: config.json is flushed this long after the last change
+FLUSH_DELAY = 0.5
+
 
 class Config:
     def __init__(self):
         self.config_dir = Path.home() / '.journal-buddy'
         self.config_file = self.config_dir / 'config.json'
         self.config_dir.mkdir(exist_ok=True)
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._batch_depth = 0
+        self._flush_timer = None
+        self._snapshot = None
         self.load_config()
+        # Don't lose a pending debounced write on exit
+        atexit.register(self.flush)
     
     def load_config(self):
         """Load configuration from file"""
         if self.config_file.exists():
             with open(self.config_file, 'r') as f:
                 self.data = json.load(f)
+            self._snapshot = None
         else:
             self.data = {
                 'vault_path': '',
                 'notification_time': '21:00',  # 9 PM default
-                'ollama_model': 'tinyllama',
+                'ollama_model': 'tinyllama',  # chat model
+                'writer_model': '',  # writes the entry; empty means the chat model
                 'first_run': True,
-                'writing_style_analyzed': False
+                'writing_style_analyzed': False,
+                'append_in_place': True,  # add entries at the end of # Logs
+                'template_path': '',  # optional template note, relative to the vault
+                'context_token_budget': 1500,  # max prompt tokens per chat turn
+                'speculative_drafting': False,  # draft the entry between turns
+                'prewarm_minutes': 5,  # load the model this long before the reminder
+                'model_idle_minutes': 10,  # unload the model after this long unused
+                'async_llm': False  # run LLM calls as coroutines on an asyncio loop
             }
             self.save_config()
     
     def save_config(self):
-        """Save configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        """Save configuration to file right away"""
+        with self._lock:
+            self._dirty = True
+        self.flush()
+    
+    def flush(self):
+        """Write pending changes atomically (temp file + rename)"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            
+            tmp_file = self.config_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_file, self.config_file)
+            self._dirty = False
+    
+    def _changed(self):
+        """Record a change and schedule a debounced flush"""
+        with self._lock:
+            self._dirty = True
+            self._snapshot = None
+            if self._batch_depth:
+                return  # flushed when the batch ends
+            
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self._flush_timer = threading.Timer(FLUSH_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    @contextmanager
+    def batch(self):
+        """Group several changes into a single write
+            
+            with config.batch():
+                config.set_vault_path(path)
+                config.set('ollama_model', model)
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                done = self._batch_depth == 0
+            if done:
+                self.flush()
+    
+    def snapshot(self):
+        """Read-only view of the current configuration
+        
+        Rebuilt only after a change, so hot paths can read it freely.
+        """
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = MappingProxyType(dict(self.data))
+            return self._snapshot
     
     def get(self, key, default=None):
         """Get configuration value"""
@@ -35,8 +118,11 @@ class Config:
     
     def set(self, key, value):
         """Set configuration value"""
-        self.data[key] = value
-        self.save_config()
+        with self._lock:
+            if key in self.data and self.data[key] == value:
+                return
+            self.data[key] = value
+            self._changed()
     
     def get_vault_path(self):
         """Get Obsidian vault path"""
@@ -44,8 +130,7 @@ class Config:
     
     def set_vault_path(self, path):
         """Set Obsidian vault path"""
-        self.data['vault_path'] = path
-        self.save_config()
+        self.set('vault_path', path)
     
     def get_notification_time(self):
         """Get notification time (HH:MM format)"""
@@ -53,5 +138,4 @@ class Config:
     
     def set_notification_time(self, time):
         """Set notification time"""
-        self.data['notification_time'] = time
-        self.save_config()
+        self.set('notification_time', time)
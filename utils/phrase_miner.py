@@ -0,0 +1,113 @@
+import re
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)*", re.UNICODE)
+# Phrases never run across sentence punctuation
+CLAUSE_PATTERN = re.compile(r'[.!?,;:()\[\]"“”…]+')
+
+MAX_NGRAM = 4
+
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before
+being but by can could did do does doing for from had has have having he her
+here him his how i if in into is it it's its itself just me my myself no nor
+not of off on once only or other our out over own same she so some such than
+that the their them then there these they this those through to too under
+until up very was we were what when where which while who why will with would
+you your
+""".split())
+
+
+class SpaceSaving:
+    """Fixed-memory heavy-hitters counter (Space-Saving)
+
+    Tracks at most 2 * capacity items. When full, it is compacted down to
+    the capacity most frequent items, and newly seen items start from the
+    largest evicted count, so counts are upper bounds that overestimate by
+    at most `floor`. Summaries built in parallel can be merged.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.floor = 0
+
+    def add(self, item, count=1):
+        """Count an occurrence of an item"""
+        if item in self.counts:
+            self.counts[item] += count
+            return
+
+        if len(self.counts) >= 2 * self.capacity:
+            self._compact()
+        self.counts[item] = self.floor + count
+
+    def remove(self, item, count=1):
+        """Take back occurrences counted earlier (e.g. from a note that changed or was deleted)"""
+        if item not in self.counts:
+            return  # its occurrences are only in the floor by now
+        self.counts[item] -= count
+        if self.counts[item] <= 0:
+            del self.counts[item]
+
+    def merge(self, counts, floor=0):
+        """Merge another summary (its counts and floor) into this one"""
+        if floor:
+            # Items the other summary doesn't track may have been seen up to floor times there
+            for item in self.counts:
+                if item not in counts:
+                    self.counts[item] += floor
+
+        for item, count in counts.items():
+            if item in self.counts:
+                self.counts[item] += count
+            else:
+                self.counts[item] = self.floor + count
+        self.floor += floor
+
+        if len(self.counts) > 2 * self.capacity:
+            self._compact()
+
+    def _compact(self):
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        self.floor = max(self.floor, ranked[self.capacity][1])
+        self.counts = dict(ranked[:self.capacity])
+
+    def top(self, n=None):
+        """Items with the highest counts, most frequent first"""
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        return ranked[:n] if n is not None else ranked
+
+
+def iter_ngrams(line, max_n=MAX_NGRAM):
+    """Yield the 1- to max_n-word phrases in a line of text
+
+    Phrases made only of stopwords are skipped.
+    """
+    for clause in CLAUSE_PATTERN.split(line.lower()):
+        words = WORD_PATTERN.findall(clause)
+        stop = [word in STOPWORDS for word in words]
+        for i in range(len(words)):
+            all_stop = True
+            for j in range(i, min(i + max_n, len(words))):
+                all_stop = all_stop and stop[j]
+                if not all_stop:
+                    yield ' '.join(words[i:j + 1])
+
+
+def top_phrases(summary, n=10, min_count=3):
+    """Pick the most common distinct phrases from a merged summary
+
+    A phrase is dropped when it overlaps (contains or is contained in) a
+    more frequent phrase that was already picked.
+    """
+    picked = []
+    # Longer phrases win ties, so "i feel like" beats "feel like"
+    ranked = sorted(summary.counts.items(), key=lambda kv: (kv[1], kv[0].count(' ')), reverse=True)
+    for phrase, count in ranked:
+        if len(picked) >= n or count - summary.floor < min_count:
+            break
+        padded = f' {phrase} '
+        if any(padded in f' {p} ' or f' {p} ' in padded for p in picked):
+            continue
+        picked.append(phrase)
+    return picked
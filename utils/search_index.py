@@ -0,0 +1,232 @@
+import os
+import re
+import sqlite3
+import threading
+from collections import namedtuple
+from pathlib import Path
+from utils.vault_index import VaultIndex, DAILY_NOTE_PATTERN
+
+# Entries JournalWriter adds to an existing note start with "##### Time - HH:MM"
+TIME_HEADING = re.compile(r'^#####\s+Time\s*-\s*(\d{1,2}:\d{2})\s*$')
+# Lines that open or close a fenced code block (a "# " inside one is not a heading)
+CODE_FENCE = re.compile(r'^\s*(```|~~~)')
+# Bump when the schema or the way notes are split changes, so the index is rebuilt
+SCHEMA_VERSION = 2
+# Marks the matched words in snippets
+SNIPPET_MARKS = ('[', ']')
+
+SCHEMA = """
+CREATE TABLE notes (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER);
+CREATE TABLE blocks (id INTEGER PRIMARY KEY, path TEXT, day TEXT, time TEXT, body TEXT);
+CREATE INDEX blocks_path ON blocks (path);
+CREATE INDEX blocks_day ON blocks (day);
+CREATE VIRTUAL TABLE blocks_fts USING fts5 (body, content='blocks', content_rowid='id',
+                                            tokenize='porter unicode61');
+CREATE TRIGGER blocks_insert AFTER INSERT ON blocks BEGIN
+    INSERT INTO blocks_fts (rowid, body) VALUES (new.id, new.body);
+END;
+CREATE TRIGGER blocks_delete AFTER DELETE ON blocks BEGIN
+    INSERT INTO blocks_fts (blocks_fts, rowid, body) VALUES ('delete', old.id, old.body);
+END;
+"""
+
+# One search result: day is YYYY-MM-DD, time is HH:MM ('' for a note's first entry)
+SearchHit = namedtuple('SearchHit', 'day time path snippet')
+
+
+def split_logs(text):
+    """The entries in a note's "# Logs" section as (time, body) pairs
+
+    The section ends at the next top-level heading outside a code block.
+    Text before the first time heading (the entry the note was created
+    with) has no time.
+    """
+    blocks = []
+    time, lines = '', None
+    in_code = False
+    for line in text.splitlines():
+        if lines is None:
+            if line.rstrip() == '# Logs':
+                lines = []
+            continue
+        if CODE_FENCE.match(line):
+            in_code = not in_code
+        elif not in_code and line.startswith('# '):
+            break
+        match = TIME_HEADING.match(line)
+        if match:
+            blocks.append((time, lines))
+            time, lines = match.group(1), []
+        else:
+            lines.append(line)
+
+    if lines is not None:
+        blocks.append((time, lines))
+    return [(time, '\n'.join(lines).strip()) for time, lines in blocks if ''.join(lines).strip()]
+
+
+def match_query(text):
+    """FTS5 query for what the user typed: all words, the last one as a prefix"""
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class SearchIndex:
+    """Full-text index (SQLite FTS5) of the journal entries in a vault
+
+    Each timestamped block in a daily note's "# Logs" section is one
+    searchable row. refresh() only re-reads notes whose mtime or size
+    changed, and JournalWriter updates the index as it writes, so a
+    search never touches the Markdown files.
+
+    The index lives in ~/.journal-buddy/search.db.
+    """
+
+    def __init__(self, vault_path, db_file=None, index=None):
+        if db_file is None:
+            db_file = Path.home() / '.journal-buddy' / 'search.db'
+        self.vault_path = Path(vault_path)
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(exist_ok=True)
+        self.index = index
+        # Used from the startup stage, the writer and the GUI thread
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock:
+            if self._db.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION:
+                return
+            for (name,) in self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                            "AND name IN ('notes', 'blocks', 'blocks_fts')").fetchall():
+                self._db.execute(f'DROP TABLE {name}')
+            self._db.executescript(SCHEMA)
+            self._db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            self._db.commit()
+
+    def _note_paths(self):
+        """Paths of the daily notes currently in the vault"""
+        if self.index is None:
+            self.index = VaultIndex(self.vault_path)
+        self.index.refresh()
+        return [self.index.path_for(date) for date in self.index.dates]
+
+    def _read_blocks(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return split_logs(f.read())
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Search index error ({Path(path).name}): {e}")
+            return []
+
+    def _store_note(self, path, stat, blocks):
+        """Replace a note's blocks (caller holds the lock and commits)"""
+        path = str(path)
+        day = Path(path).stem
+        self._db.execute('DELETE FROM blocks WHERE path = ?', (path,))
+        self._db.executemany('INSERT INTO blocks (path, day, time, body) VALUES (?, ?, ?, ?)',
+                             [(path, day, time, body) for time, body in blocks])
+        self._db.execute('INSERT OR REPLACE INTO notes (path, mtime_ns, size) VALUES (?, ?, ?)',
+                         (path, stat.st_mtime_ns, stat.st_size))
+
+    def _forget_note(self, path):
+        self._db.execute('DELETE FROM blocks WHERE path = ?', (path,))
+        self._db.execute('DELETE FROM notes WHERE path = ?', (path,))
+
+    def refresh(self):
+        """Index new and changed notes and drop deleted ones; returns how many notes changed
+
+        Notes are read without holding the lock, so searches keep working
+        while a large vault is indexed for the first time.
+        """
+        paths = self._note_paths()
+        with self._lock:
+            known = {path: (mtime, size) for path, mtime, size
+                     in self._db.execute('SELECT path, mtime_ns, size FROM notes')}
+
+        changed = 0
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if known.pop(str(path), None) != (stat.st_mtime_ns, stat.st_size):
+                blocks = self._read_blocks(path)
+                with self._lock:
+                    self._store_note(path, stat, blocks)
+                changed += 1
+
+        with self._lock:
+            # Whatever is left was deleted, renamed or belongs to another vault
+            for path in known:
+                self._forget_note(path)
+            self._db.commit()
+        return changed + len(known)
+
+    def update_file(self, path):
+        """Re-index one note right after it was written"""
+        path = Path(path)
+        if not DAILY_NOTE_PATTERN.match(path.name):
+            return
+        try:
+            stat = os.stat(path)
+            blocks = self._read_blocks(path)
+        except OSError:
+            stat = None
+        try:
+            with self._lock:
+                if stat is None:
+                    self._forget_note(str(path))
+                else:
+                    self._store_note(path, stat, blocks)
+                self._db.commit()
+        except sqlite3.Error as e:
+            # The entry is saved either way; the next refresh() picks it up
+            print(f"Search index error: {e}")
+
+    def search(self, text, limit=20, start=None, end=None):
+        """Entries matching all the words typed (the last may be partial), best first
+
+        start/end (dates) limit the search to the daily notes in that range.
+        """
+        query = match_query(text)
+        if query is None:
+            return []
+
+        sql = ("SELECT b.day, b.time, b.path, snippet(blocks_fts, 0, ?, ?, '…', 16) "
+               "FROM blocks_fts JOIN blocks b ON b.id = blocks_fts.rowid WHERE blocks_fts MATCH ?")
+        params = [*SNIPPET_MARKS, query]
+        if start is not None:
+            sql += ' AND b.day >= ?'
+            params.append(start.strftime('%Y-%m-%d'))
+        if end is not None:
+            sql += ' AND b.day <= ?'
+            params.append(end.strftime('%Y-%m-%d'))
+        sql += ' ORDER BY rank LIMIT ?'
+        params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [SearchHit(day, time, Path(path), snippet) for day, time, path, snippet in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM blocks').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_search_index(vault_path, index=None):
+    """The vault's SearchIndex, or None if SQLite lacks FTS5 (search is then unavailable)"""
+    try:
+        return SearchIndex(vault_path, index=index)
+    except sqlite3.Error as e:
+        print(f"Search index unavailable: {e}")
+        return None
@@ -1,12 +1,157 @@
+import multiprocessing
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from collections import Counter
+from utils.phrase_miner import SpaceSaving, iter_ngrams, top_phrases
+from utils.vault_index import VaultIndex
+
+EMOJI_PATTERN = re.compile("["
+    u"\U0001F600-\U0001F64F"  # emoticons
+    u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+    u"\U0001F680-\U0001F6FF"  # transport & map symbols
+    u"\U0001F1E0-\U0001F1FF"  # flags
+    "]+", flags=re.UNICODE)
+CASUAL_PATTERN = re.compile(r'\b(like|yeah|damn|lol|omg|btw)\b', re.IGNORECASE)
+
+# Below this many notes to parse, a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+SAMPLE_LENGTH = 500
+# Number of phrases the heavy-hitters summary keeps, whatever the vault size
+PHRASE_CAPACITY = 1000
+# Workers start from a clean process: forking the multi-threaded Qt app can deadlock them
+MP_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def _logs_lines(file):
+    """Yield the lines of a note after its "# Logs" heading"""
+    with open(file, 'r', encoding='utf-8') as f:
+        for line in f:
+            # The same exact heading match as JournalWriter and the search index
+            if line.rstrip() == '# Logs':
+                break
+        else:
+            return
+        yield from f
+
+
+def extract_features(file, phrases=None):
+    """Extract the style features of one journal note in a single pass
+
+    Returns a small, mergeable JSON-serialisable dict. Notes without a
+    "# Logs" section give an empty dict. If a SpaceSaving summary is given,
+    every phrase the note uses is counted into it once, so its counts are
+    the number of notes using each phrase.
+    """
+    features, seen_phrases = _note_features(file, phrases is not None)
+    if phrases is not None:
+        for phrase in seen_phrases:
+            phrases.add(phrase)
+    return features
+
+
+def _note_features(file, with_phrases=True):
+    """A note's style features and the set of phrases it uses"""
+    features = {}
+    paragraph_words = 0
+    in_paragraph = False
+    seen_phrases = set()
+    
+    for line in _logs_lines(file):
+        if not features:
+            features = {
+                'emoji_count': 0,
+                'casual_markers': 0,
+                'highlight_text': False,
+                'blockquotes': False,
+                'bold': False,
+                'paragraphs': 0,
+                'paragraph_words': 0
+            }
+        
+        features['emoji_count'] += len(EMOJI_PATTERN.findall(line))
+        features['casual_markers'] += len(CASUAL_PATTERN.findall(line))
+        if '==' in line:
+            features['highlight_text'] = True
+        if line.startswith('>'):
+            features['blockquotes'] = True
+        if line.startswith('**'):
+            features['bold'] = True
+        
+        # Paragraphs are runs of text lines; headings (e.g. "##### Time") don't count
+        stripped = line.strip()
+        if stripped and not stripped.startswith('#'):
+            if not in_paragraph:
+                features['paragraphs'] += 1
+                in_paragraph = True
+            paragraph_words += len(stripped.split())
+            if with_phrases:
+                seen_phrases.update(iter_ngrams(stripped))
+        else:
+            in_paragraph = False
+    
+    if features:
+        features['paragraph_words'] = paragraph_words
+    return features, seen_phrases
+
+
+def _extract_batch(files):
+    """Process pool entry point: features for a batch of notes plus their phrase summary
+
+    Unreadable notes give None. Only the bounded summary goes back to the
+    parent, never the notes' text, along with the phrases each note added
+    to it that it still tracks.
+    """
+    phrases = SpaceSaving(PHRASE_CAPACITY)
+    features = []
+    note_phrases = []
+    for file in files:
+        try:
+            note, seen = _note_features(file)
+        except (OSError, UnicodeDecodeError):
+            features.append(None)
+            note_phrases.append(set())
+            continue
+        for phrase in seen:
+            phrases.add(phrase)
+        features.append(note)
+        note_phrases.append(seen)
+    # Occurrences of the phrases it no longer tracks are only in the floor
+    note_phrases = [sorted(seen & phrases.counts.keys()) for seen in note_phrases]
+    return features, note_phrases, phrases.counts, phrases.floor
+
+
+def read_sample(file, length=SAMPLE_LENGTH):
+    """Read the start of a note's "# Logs" section"""
+    sample = []
+    size = 0
+    for line in _logs_lines(file):
+        sample.append(line)
+        size += len(line)
+        if size >= length:
+            break
+    return ''.join(sample)[:length]
+
 
 class StyleAnalyzer:
-    def __init__(self, vault_path):
+    def __init__(self, vault_path, cache=None, index=None, max_workers=None):
         self.vault_path = Path(vault_path)
-        self.style_profile = {
+        self.cache = cache
+        self.index = index if index is not None else VaultIndex(vault_path)
+        self.max_workers = max_workers
+        self.style_profile = self._empty_profile()
+        self.phrases = self._load_phrases()
+    
+    def _load_phrases(self):
+        """Vault-wide phrase summary, starting from the cached one if there is one"""
+        phrases = SpaceSaving(PHRASE_CAPACITY)
+        if self.cache is not None:
+            phrases.merge(self.cache.phrases.get('counts', {}), self.cache.phrases.get('floor', 0))
+        return phrases
+    
+    def _empty_profile(self):
+        return {
             'common_phrases': [],
             'avg_paragraph_length': 0,
             'uses_emojis': False,
@@ -15,61 +160,141 @@ class StyleAnalyzer:
             'sample_entries': []
         }
     
+    def _extract_all(self, files):
+        """Extract features for notes, fanning out across processes for big batches
+
+        Phrases from the parsed notes are merged into self.phrases. Returns
+        each note's features and the phrases it added to self.phrases.
+        """
+        if len(files) < PARALLEL_THRESHOLD:
+            batches = [files]
+        else:
+            batch_size = -(-len(files) // ((self.max_workers or os.cpu_count() or 1) * 4))
+            batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+        
+        if len(batches) == 1:
+            results = [_extract_batch(files)]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers,
+                                     mp_context=multiprocessing.get_context(MP_START_METHOD)) as executor:
+                results = list(executor.map(_extract_batch, batches))
+        
+        features = []
+        note_phrases = []
+        for batch_features, batch_phrases, counts, floor in results:
+            features.extend(batch_features)
+            note_phrases.extend(batch_phrases)
+            self.phrases.merge(counts, floor)
+        tracked = self.phrases.counts
+        return features, [[phrase for phrase in seen if phrase in tracked] for seen in note_phrases]
+    
+    def _forget_phrases(self, phrases):
+        """Take a note's earlier phrases back out of the vault-wide summary"""
+        for phrase in phrases:
+            self.phrases.remove(phrase)
+    
+    def _collect_features(self, files):
+        """Get every note's features, re-parsing only notes the cache doesn't have"""
+        records = {}
+        stale = []
+        
+        for file in files:
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            
+            features = self.cache.get(file, stat) if self.cache is not None else None
+            if features is None:
+                stale.append((file, stat))
+            else:
+                records[file] = features
+        
+        parsed, note_phrases = self._extract_all([file for file, stat in stale])
+        for (file, stat), features, phrases in zip(stale, parsed, note_phrases):
+            if features is None:
+                continue  # unreadable note
+            records[file] = features
+            if self.cache is not None:
+                # A changed note was just counted again, so its old phrases come out
+                self._forget_phrases(self.cache.phrases_of(file))
+                self.cache.put(file, stat, features, phrases)
+        
+        return records
+    
     def analyze_existing_journals(self):
         """Analyze existing journal entries to learn writing style"""
-        journal_files = list(self.vault_path.glob('*.md'))
+        self.style_profile = self._empty_profile()
+        if self.cache is None:
+            # Every note gets parsed again, so start counting from scratch
+            self.phrases = SpaceSaving(PHRASE_CAPACITY)
+        self.index.refresh()
         
+        journal_files = self.index.recent(len(self.index))  # newest first
         if not journal_files:
             return self.style_profile
         
-        all_text = []
-        emoji_count = 0
+        records = self._collect_features(journal_files)
+        
+        if self.cache is not None:
+            for phrases in self.cache.prune(journal_files):
+                self._forget_phrases(phrases)
+            self.cache.set_phrases(self.phrases.counts, self.phrases.floor)
+            try:
+                self.cache.save()
+            except OSError as e:
+                print(f"Style cache error: {e}")
+        
+        self._build_profile(journal_files, records)
+        return self.style_profile
+    
+    def _build_profile(self, journal_files, records):
+        """Merge per-file features into the style profile"""
+        with_logs = [file for file in journal_files if records.get(file)]
+        if not with_logs:
+            return
         
-        for file in journal_files[:10]:  # Analyze last 10 entries
+        # Store samples from the most recent entries
+        for file in with_logs[:3]:
             try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                    # Extract content after "# Logs" section
-                    logs_match = re.search(r'# Logs\n(.*)', content, re.DOTALL)
-                    if logs_match:
-                        journal_text = logs_match.group(1)
-                        all_text.append(journal_text)
-                        
-                        # Count emojis
-                        emoji_pattern = re.compile("["
-                            u"\U0001F600-\U0001F64F"  # emoticons
-                            u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-                            u"\U0001F680-\U0001F6FF"  # transport & map symbols
-                            u"\U0001F1E0-\U0001F1FF"  # flags
-                            "]+", flags=re.UNICODE)
-                        emoji_count += len(emoji_pattern.findall(journal_text))
-                        
-                        # Store sample
-                        if len(self.style_profile['sample_entries']) < 3:
-                            self.style_profile['sample_entries'].append(journal_text[:500])
-            except Exception as e:
+                self.style_profile['sample_entries'].append(read_sample(file))
+            except (OSError, UnicodeDecodeError):
                 continue
         
-        if all_text:
-            combined = '\n'.join(all_text)
-            
-            # Detect emoji usage
-            self.style_profile['uses_emojis'] = emoji_count > 5
-            
-            # Analyze tone (simple heuristic)
-            casual_markers = len(re.findall(r'\b(like|yeah|damn|lol|omg|btw)\b', combined, re.IGNORECASE))
-            self.style_profile['tone'] = 'casual' if casual_markers > 3 else 'neutral'
-            
-            # Detect formatting preferences
-            if '==' in combined:
-                self.style_profile['formatting_preferences'].append('highlight_text')
-            if re.search(r'^>', combined, re.MULTILINE):
-                self.style_profile['formatting_preferences'].append('blockquotes')
-            if re.search(r'^\*\*', combined, re.MULTILINE):
-                self.style_profile['formatting_preferences'].append('bold')
+        totals = Counter()
+        for file in with_logs:
+            totals.update(records[file])
+        notes = len(with_logs)
         
-        return self.style_profile
+        # Thresholds are per 10 notes, so they mean the same for any vault size
+        # Detect emoji usage
+        self.style_profile['uses_emojis'] = totals['emoji_count'] * 10 / notes > 5
+        
+        # Analyze tone (simple heuristic)
+        self.style_profile['tone'] = 'casual' if totals['casual_markers'] * 10 / notes > 3 else 'neutral'
+        
+        # Detect formatting preferences (used in at least 1 of every 10 notes)
+        for preference in ('highlight_text', 'blockquotes', 'bold'):
+            if totals[preference] * 10 >= notes:
+                self.style_profile['formatting_preferences'].append(preference)
+        
+        if totals['paragraphs']:
+            self.style_profile['avg_paragraph_length'] = round(totals['paragraph_words'] / totals['paragraphs'])
+        
+        self.style_profile['common_phrases'] = top_phrases(self.phrases)
+    
+    def update_file(self, file):
+        """Refresh the cached features of a single note (e.g. after saving an entry)"""
+        if self.cache is None:
+            return
+        
+        file = Path(file)
+        try:
+            self._collect_features([file])
+            self.cache.set_phrases(self.phrases.counts, self.phrases.floor)
+            self.cache.save()
+        except Exception as e:
+            print(f"Style cache error: {e}")
     
     def get_style_instructions(self):
         """Generate instructions for LLM based on analyzed style"""
@@ -88,6 +313,13 @@ class StyleAnalyzer:
         if 'blockquotes' in self.style_profile['formatting_preferences']:
             instructions.append("Use blockquotes (>) for nested thoughts or context")
         
+        if self.style_profile['common_phrases']:
+            phrases = ', '.join(f'"{phrase}"' for phrase in self.style_profile['common_phrases'][:8])
+            instructions.append(f"Naturally use phrases they often use, like {phrases}")
+        
+        if self.style_profile['avg_paragraph_length']:
+            instructions.append(f"Keep paragraphs around {self.style_profile['avg_paragraph_length']} words long")
+        
         instructions.append("Write detailed narrative storytelling with self-aware commentary")
         instructions.append("Include specific details, internal feelings, and moment-by-moment descriptions")
         
@@ -0,0 +1,90 @@
+import json
+import os
+from pathlib import Path
+
+
+class StyleCache:
+    """Persistent per-file style features, keyed by path, mtime and size
+
+    Lets StyleAnalyzer skip re-parsing notes that haven't changed since
+    the last launch. Also holds the vault-wide phrase summary and, per
+    note, the phrases it added to it, so a changed or deleted note's old
+    phrases can be taken back out.
+    """
+
+    # Bump when the feature format changes so old caches are rebuilt
+    VERSION = 5
+
+    def __init__(self, cache_file=None):
+        if cache_file is None:
+            cache_file = Path.home() / '.journal-buddy' / 'style_cache.json'
+        self.cache_file = Path(cache_file)
+        self.cache_file.parent.mkdir(exist_ok=True)
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Load cached features from disk"""
+        self.files = {}
+        self.phrases = {}
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.VERSION:
+                    self.files = data.get('files', {})
+                    self.phrases = data.get('phrases', {})
+            except (OSError, ValueError) as e:
+                # A corrupt cache only costs a rescan
+                print(f"Style cache error: {e}")
+
+    def save(self):
+        """Write the cache to disk if anything changed"""
+        if not self.dirty:
+            return
+
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'files': self.files, 'phrases': self.phrases}, f)
+        os.replace(tmp_file, self.cache_file)
+        self.dirty = False
+
+    def get(self, path, stat):
+        """Return cached features for a file, or None if missing or stale"""
+        record = self.files.get(str(path))
+        if record and record['mtime'] == stat.st_mtime and record['size'] == stat.st_size:
+            return record['features']
+        return None
+
+    def put(self, path, stat, features, phrases=()):
+        """Store features for a file, and the phrases it added to the phrase summary"""
+        self.files[str(path)] = {
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'features': features,
+            'phrases': list(phrases)
+        }
+        self.dirty = True
+
+    def phrases_of(self, path):
+        """Phrases a file added to the phrase summary when it was last parsed"""
+        record = self.files.get(str(path))
+        return record.get('phrases', []) if record else []
+
+    def prune(self, paths):
+        """Forget files that are no longer part of the analysis
+
+        Returns the phrases each forgotten file had added to the summary.
+        """
+        keep = {str(path) for path in paths}
+        removed = []
+        for key in list(self.files):
+            if key not in keep:
+                removed.append(self.files.pop(key).get('phrases', []))
+                self.dirty = True
+        return removed
+
+    def set_phrases(self, counts, floor):
+        """Store the vault-wide phrase summary"""
+        self.phrases = {'counts': counts, 'floor': floor}
+        self.dirty = True
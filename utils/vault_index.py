@@ -0,0 +1,98 @@
+import bisect
+import os
+import re
+from datetime import date as date_type, datetime
+from pathlib import Path
+
+# Daily notes are named YYYY-MM-DD.md by JournalWriter
+DAILY_NOTE_PATTERN = re.compile(r'^(\d{4})-(\d{2})-(\d{2})\.md$')
+
+
+class VaultIndex:
+    """Date-ordered index of the daily notes in a vault
+
+    The vault directory is scanned once; lookups after that are served
+    from memory. refresh() only rescans when the directory's mtime changed,
+    which happens when notes are added, removed or renamed.
+    """
+
+    def __init__(self, vault_path):
+        self.vault_path = Path(vault_path)
+        self.dates = []  # sorted list of datetime.date
+        self._date_set = set()
+        self._dir_mtime = None
+        self.refresh()
+
+    def refresh(self):
+        """Rescan the vault if its directory listing changed"""
+        try:
+            mtime = os.stat(self.vault_path).st_mtime_ns
+        except OSError:
+            self.dates = []
+            self._date_set = set()
+            self._dir_mtime = None
+            return
+
+        if mtime == self._dir_mtime:
+            return
+
+        dates = []
+        with os.scandir(self.vault_path) as entries:
+            for entry in entries:
+                match = DAILY_NOTE_PATTERN.match(entry.name)
+                if not match:
+                    continue
+                try:
+                    dates.append(date_type(*map(int, match.groups())))
+                except ValueError:
+                    continue  # e.g. 2026-02-30.md
+
+        dates.sort()
+        self.dates = dates
+        self._date_set = set(dates)
+        self._dir_mtime = mtime
+
+    def _as_date(self, value):
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
+    def path_for(self, date):
+        """Path of the daily note for a date (whether or not it exists)"""
+        return self.vault_path / (date.strftime('%Y-%m-%d') + '.md')
+
+    def exists(self, date):
+        """Check if there is a daily note for a date"""
+        return self._as_date(date) in self._date_set
+
+    def add(self, date):
+        """Record a newly created daily note"""
+        date = self._as_date(date)
+        if date not in self._date_set:
+            bisect.insort(self.dates, date)
+            self._date_set.add(date)
+
+    def recent(self, n):
+        """Paths of the N most recent daily notes, newest first"""
+        if n <= 0:
+            return []
+        return [self.path_for(d) for d in reversed(self.dates[-n:])]
+
+    def between(self, start, end):
+        """Paths of the daily notes from start to end (inclusive), oldest first"""
+        lo = bisect.bisect_left(self.dates, self._as_date(start))
+        hi = bisect.bisect_right(self.dates, self._as_date(end))
+        return [self.path_for(d) for d in self.dates[lo:hi]]
+
+    def before(self, date):
+        """Date of the closest daily note before a date, or None"""
+        i = bisect.bisect_left(self.dates, self._as_date(date))
+        return self.dates[i - 1] if i > 0 else None
+
+    def after(self, date):
+        """Date of the closest daily note after a date, or None"""
+        i = bisect.bisect_right(self.dates, self._as_date(date))
+        return self.dates[i] if i < len(self.dates) else None
+
+    def __len__(self):
+        return len(self.dates)